@@ -0,0 +1,125 @@
+# audio_server.py - Serve generated audio with Range requests and long-lived caching
+
+import os
+import re
+import mimetypes
+from typing import Optional, Tuple
+
+from fastapi import Request, Response
+from fastapi.responses import StreamingResponse
+from fastapi.middleware.gzip import GZipMiddleware
+
+AUDIO_CHUNK_SIZE = 64 * 1024
+
+# Clip and track names are content hashes (older clips are unique timestamps),
+# so a URL never changes content and can be cached forever
+AUDIO_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+AUDIO_MEDIA_TYPES = {
+    ".wav": "audio/wav",
+    ".aiff": "audio/aiff",
+    ".opus": "audio/ogg",
+    ".ogg": "audio/ogg",
+    ".mp3": "audio/mpeg",
+}
+
+# Responses that gzip can't shrink (audio) or must not buffer (SSE)
+GZIP_SKIP_PREFIXES = ("/tts_output/", "/generate/stream")
+
+_range_pattern = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+
+class SelectiveGZipMiddleware(GZipMiddleware):
+    """GZipMiddleware that passes GZIP_SKIP_PREFIXES paths through untouched"""
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http" and scope["path"].startswith(GZIP_SKIP_PREFIXES):
+            await self.app(scope, receive, send)
+            return
+        await super().__call__(scope, receive, send)
+
+
+def parse_range(header: str, size: int) -> Optional[Tuple[int, int]]:
+    """
+    Inclusive (start, end) for a single 'bytes=' range.
+
+    Returns None when the header should be ignored (malformed or multiple
+    ranges) and raises ValueError when the range can't be satisfied.
+    """
+    match = _range_pattern.match(header.strip())
+    if not match:
+        return None
+    first, last = match.groups()
+    if not first and not last:
+        return None
+
+    if not first:
+        # Suffix range: the last N bytes
+        length = int(last)
+        if length == 0:
+            raise ValueError("empty suffix range")
+        return max(0, size - length), size - 1
+
+    start = int(first)
+    end = min(int(last), size - 1) if last else size - 1
+    if start >= size or start > end:
+        raise ValueError("range outside file")
+    return start, end
+
+
+def read_file(path: str, start: int, end: int):
+    with open(path, "rb") as f:
+        f.seek(start)
+        remaining = end - start + 1
+        while remaining > 0:
+            chunk = f.read(min(AUDIO_CHUNK_SIZE, remaining))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            yield chunk
+
+
+def audio_response(request: Request, folder: str, filename: str) -> Response:
+    """GET/HEAD response for one audio file, honoring If-None-Match and Range"""
+    path = os.path.join(folder, filename)
+    # Hidden names are in-progress renders
+    if os.path.basename(filename) != filename or filename.startswith(".") or not os.path.isfile(path):
+        return Response(status_code=404)
+
+    stat = os.stat(path)
+    size = stat.st_size
+    # Not mtime: cache hits touch it to keep clips in the LRU
+    etag = f'"{os.path.splitext(filename)[0]}-{size:x}"'
+    headers = {
+        "Accept-Ranges": "bytes",
+        "Cache-Control": AUDIO_CACHE_CONTROL,
+        "ETag": etag,
+    }
+    media_type = AUDIO_MEDIA_TYPES.get(os.path.splitext(filename)[1].lower()) \
+        or mimetypes.guess_type(filename)[0] or "application/octet-stream"
+
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and (if_none_match.strip() == "*" or etag in [t.strip() for t in if_none_match.split(",")]):
+        return Response(status_code=304, headers=headers)
+
+    byte_range = None
+    range_header = request.headers.get("range")
+    if_range = request.headers.get("if-range")
+    if range_header and (not if_range or if_range.strip() == etag):
+        try:
+            byte_range = parse_range(range_header, size)
+        except ValueError:
+            return Response(status_code=416, headers={**headers, "Content-Range": f"bytes */{size}"})
+
+    status = 200
+    start, end = 0, size - 1
+    if byte_range:
+        start, end = byte_range
+        status = 206
+        headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+    headers["Content-Length"] = str(end - start + 1)
+
+    if request.method == "HEAD" or size == 0:
+        return Response(status_code=status, headers=headers, media_type=media_type)
+    return StreamingResponse(read_file(path, start, end), status_code=status,
+                             headers=headers, media_type=media_type)
@@ -0,0 +1,126 @@
+# audio_track.py - Stitch an episode's per-speaker clips into one compressed track
+
+import os
+import json
+import uuid
+import wave
+import shutil
+import hashlib
+import asyncio
+from typing import Optional
+
+from app.tts_client import run_tts_command
+
+AUDIO_TRACK_FORMAT = os.getenv("AUDIO_TRACK_FORMAT", "opus")  # "opus" or "mp3"
+AUDIO_TRACK_BITRATE = os.getenv("AUDIO_TRACK_BITRATE", "32k")  # Plenty for synthesized speech
+AUDIO_TRACK_GAP = float(os.getenv("AUDIO_TRACK_GAP", "0.35"))  # Seconds of silence between speakers
+AUDIO_TRACK_SAMPLE_RATE = 24000  # Opus-native rate; espeak-ng renders at 22050
+
+# ffmpeg encoder, extension and extra encoder options per format
+TRACK_CODECS = {
+    "opus": ("libopus", "opus", ["-application", "voip"]),  # Opus' speech-tuned mode
+    "mp3": ("libmp3lame", "mp3", []),
+}
+
+
+def ffmpeg_available() -> bool:
+    return shutil.which("ffmpeg") is not None
+
+
+async def clip_duration(path: str) -> float:
+    """Length of a clip in seconds: read from the WAV header, else ask ffprobe"""
+    try:
+        with wave.open(path, "rb") as clip:
+            return clip.getnframes() / float(clip.getframerate())
+    except (wave.Error, EOFError):
+        pass
+
+    # AIFF from macOS 'say' isn't readable by the wave module
+    proc = await asyncio.create_subprocess_exec(
+        "ffprobe", "-v", "error", "-show_entries", "format=duration",
+        "-of", "default=noprint_wrappers=1:nokey=1", path,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.DEVNULL,
+    )
+    stdout, _ = await proc.communicate()
+    return float(stdout.strip() or 0)
+
+
+def track_filename(clips: list, extension: str) -> str:
+    """Content-addressed name: the same clips, gap and encoding give the same file"""
+    payload = json.dumps([clips, AUDIO_TRACK_GAP, AUDIO_TRACK_BITRATE, extension])
+    return f"track_{hashlib.sha256(payload.encode('utf-8')).hexdigest()[:32]}.{extension}"
+
+
+def concat_args(paths: list, output: str, codec: str, options: list) -> list:
+    """ffmpeg command: resample every clip, pad all but the last with silence, concat, encode"""
+    args = ["ffmpeg", "-y", "-v", "error"]
+    for path in paths:
+        args += ["-i", path]
+
+    filters = []
+    for i in range(len(paths)):
+        chain = f"[{i}:a]aresample={AUDIO_TRACK_SAMPLE_RATE},aformat=channel_layouts=mono"
+        if i < len(paths) - 1:
+            chain += f",apad=pad_dur={AUDIO_TRACK_GAP}"
+        filters.append(chain + f"[a{i}]")
+    inputs = "".join(f"[a{i}]" for i in range(len(paths)))
+    filters.append(f"{inputs}concat=n={len(paths)}:v=0:a=1[out]")
+
+    return args + [
+        "-filter_complex", ";".join(filters),
+        "-map", "[out]",
+        "-c:a", codec,
+        "-b:a", AUDIO_TRACK_BITRATE,
+        *options,
+        output,
+    ]
+
+
+async def build_episode_track(turns: list, folder: str = "tts_output") -> Optional[dict]:
+    """
+    Encode an episode's clips into a single track with per-speaker segments.
+
+    Returns {"audio_track": "/tts_output/<file>", "segments": [...]} where
+    each segment is {"index", "speaker", "start", "end"} in seconds into the
+    track, or None when there are no clips or ffmpeg isn't installed. The
+    individual clips stay in place; they are still shared by the TTS cache.
+    """
+    if AUDIO_TRACK_FORMAT not in TRACK_CODECS:
+        raise ValueError(f"Unsupported AUDIO_TRACK_FORMAT: {AUDIO_TRACK_FORMAT}")
+
+    voiced = [(index, turn) for index, turn in enumerate(turns) if turn.get("tts")]
+    if not voiced or not ffmpeg_available():
+        return None
+
+    clips = [os.path.basename(turn["tts"]) for _, turn in voiced]
+    paths = [os.path.join(folder, clip) for clip in clips]
+
+    segments = []
+    position = 0.0
+    for (index, turn), path in zip(voiced, paths):
+        duration = await clip_duration(path)
+        segments.append({
+            "index": index,
+            "speaker": turn["speaker"],
+            "start": round(position, 3),
+            "end": round(position + duration, 3),
+        })
+        position += duration + AUDIO_TRACK_GAP
+
+    codec, extension, options = TRACK_CODECS[AUDIO_TRACK_FORMAT]
+    filename = track_filename(clips, extension)
+    filepath = os.path.join(folder, filename)
+
+    if not os.path.exists(filepath):
+        # Encode into a hidden temp file so readers never see a partial track
+        tmp_path = os.path.join(folder, f".{uuid.uuid4().hex}.{filename}")
+        try:
+            # Counts against TTS_CONCURRENCY like the speech renders do
+            await run_tts_command(concat_args(paths, tmp_path, codec, options))
+            os.replace(tmp_path, filepath)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    return {"audio_track": f"/tts_output/{filename}", "segments": segments}
@@ -43,3 +43,65 @@ CHARACTERS = [
     },
 ]
 
+
+GOVERNMENT_JOBS_TOPIC = {
+    "key": "government_jobs",
+    "topic": "Government Jobs and Exams in India",
+    "characters": CHARACTERS,
+    "intro": (
+        "Welcome to the AI Roundtable. Today we discuss Government Jobs and Exams in India. "
+        "Our panel includes an Exam Strategist, a Serving Officer, a Fresh Qualifier, and a Citizen."
+    ),
+    "system_prompt": """
+You are generating a lively, engaging roundtable discussion with EXACTLY 4 characters.
+
+CHARACTERS:
+- Exam Strategist: Experienced mentor, practical and strategic
+- Serving Officer: Current government officer, realistic and grounded
+- Fresh Qualifier: Recent exam qualifier, energetic and relatable
+- Citizen: Informed citizen, asks tough questions, sometimes skeptical
+
+CONVERSATION STYLE:
+- Keep responses SHORT (1-3 sentences max)
+- Use natural, conversational language
+- Show personality and emotion
+- Disagree respectfully when appropriate
+- Build on what others say
+- Ask follow-up questions
+- Use examples and stories
+
+OUTPUT RULES:
+1. Output ONLY valid JSON
+2. Output ONLY a JSON list
+3. EXACTLY 4 objects with "speaker" and "message"
+4. NO markdown, NO code blocks, NO trailing commas
+5. Each message: 1-3 sentences maximum
+""",
+    "turn_template": """
+Topic: {topic}
+
+Recent conversation:
+{history}
+
+Now generate the NEXT TURN with natural, engaging responses.
+
+GUIDELINES:
+- Keep each response 1-3 sentences
+- Show personality and emotion
+- React to what others said
+- Ask questions or challenge ideas when natural
+- Use examples from Indian context
+- Make it sound like a real conversation
+
+Respond with JSON list of 4 objects:
+
+[
+  {{"speaker": "Exam Strategist", "message": "Short, natural response" }},
+  {{"speaker": "Serving Officer", "message": "Short, natural response" }},
+  {{"speaker": "Fresh Qualifier", "message": "Short, natural response" }},
+  {{"speaker": "Citizen", "message": "Short, natural response" }}
+]
+
+NO extra text. NO markdown.
+""",
+}
@@ -2,77 +2,481 @@
 Real-time chat system using WebSockets
 """
 from fastapi import WebSocket, WebSocketDisconnect
-from typing import List, Dict
+from typing import List, Dict, Deque, Optional, Set, Tuple
+from collections import deque
+from itertools import count, islice
 from datetime import datetime
-import json
+import asyncio
+import logging
+import os
+import re
+import socket
+import time
+import uuid
+import orjson
+
+from app.chat_backplane import LocalBackplane, create_backplane
+
+logger = logging.getLogger(__name__)
+
+CHAT_SEND_QUEUE_MAX = int(os.getenv("CHAT_SEND_QUEUE_MAX", "256"))  # Frames waiting per client
+CHAT_SEND_TIMEOUT = float(os.getenv("CHAT_SEND_TIMEOUT", "10"))  # Seconds one frame may take to send
+CHAT_MAX_BEHIND = float(os.getenv("CHAT_MAX_BEHIND", "30"))  # Seconds a client's queue may stay backed up before it is cut off
+CHAT_PRESENCE_INTERVAL = float(os.getenv("CHAT_PRESENCE_INTERVAL", "15"))  # Seconds between presence heartbeats to other workers
+CHAT_BATCH_TICK = float(os.getenv("CHAT_BATCH_TICK", "0.05"))  # Seconds to collect a room's frames into one; 0 sends each at once
+CHAT_BATCH_MAX = int(os.getenv("CHAT_BATCH_MAX", "50"))  # Frames per batch at most; a full batch goes out before the tick
+
+DEFAULT_ROOM = "general"
+ROOM_NAME_MAX = 64
+_room_invalid = re.compile(r"[^a-z0-9_-]+")
+
+
+def normalize_room(name: Optional[str]) -> str:
+    """Room id for a topic name: 'World History' -> 'world_history'; blank -> DEFAULT_ROOM"""
+    room = _room_invalid.sub("_", (name or "").strip().lower()).strip("_")[:ROOM_NAME_MAX]
+    return room or DEFAULT_ROOM
+
+
+def describe_names(names: List[str]) -> str:
+    """'alice', 'alice and bob', 'alice, bob and 3 others'"""
+    if len(names) == 1:
+        return names[0]
+    if len(names) <= 3:
+        return f"{', '.join(names[:-1])} and {names[-1]}"
+    return f"{names[0]}, {names[1]} and {len(names) - 2} others"
+
+
+class ChatConnection:
+    """One chat socket, its outbound queue and writer task"""
+
+    __slots__ = ("websocket", "username", "member", "room", "connected_at", "queue", "writer",
+                 "dropped", "behind_since", "closing")
+
+    def __init__(self, websocket: WebSocket, username: str, member: str, room: str):
+        self.websocket = websocket
+        self.username = username
+        self.member = member  # Id across all workers, "<node>/<n>"
+        self.room = room
+        self.connected_at = datetime.now().isoformat()
+        self.queue = asyncio.Queue(maxsize=CHAT_SEND_QUEUE_MAX)
+        self.writer: Optional[asyncio.Task] = None
+        self.dropped = 0
+        self.behind_since: Optional[float] = None
+        self.closing = False
+
+
+class ChatRoom:
+    """One topic's chat: its sockets on this worker, its members on every worker, its history"""
+
+    __slots__ = ("name", "connections", "members", "history", "pending", "presence", "_online")
+
+    def __init__(self, name: str, max_history: int):
+        self.name = name
+        self.connections: Dict[WebSocket, ChatConnection] = {}  # This worker only, in join order
+        self.members: Dict[str, str] = {}  # Member id -> username, across all workers
+        self.history: Deque[Dict] = deque(maxlen=max_history)
+        self.pending: List[Dict] = []  # Frames waiting for the next tick
+        self.presence: Dict[str, Tuple[str, int]] = {}  # Member id -> (username, joins minus leaves) since the last tick
+        self._online: Optional[Dict] = None  # Cached {"users", "count"}
+
+    def take_batch(self) -> Tuple[List[Dict], List[str], List[Tuple[str, str]]]:
+        """
+        Pending frames, who left and who joined since the last tick: names,
+        and (member, name) pairs; all three start over for the next tick.
+
+        Counted per connection, so two users sharing a name both show and a
+        reconnect reads "left" then "joined"; a connection that joins and
+        leaves within one tick says nothing.
+        """
+        frames, self.pending = self.pending, []
+        presence, self.presence = self.presence, {}
+        left = [name for name, delta in presence.values() if delta < 0]
+        joined = [(member, name) for member, (name, delta) in presence.items() if delta > 0]
+        return frames, left, joined
+
+    def presence_notices(self, left: List[str], joined: List[str]) -> List[Dict]:
+        """One notice each for who left and who joined"""
+        timestamp = datetime.now().isoformat()
+        return [{
+            "type": "system",
+            "message": f"{describe_names(names)} {verb} the chat",
+            "timestamp": timestamp,
+            "online_count": len(self.members)
+        } for verb, names in (("left", left), ("joined", joined)) if names]
+
+    def is_empty(self) -> bool:
+        return not self.members and not self.connections
+
+    def add_member(self, member: str, username: str):
+        self.members[member] = username
+        if self._online is not None:
+            # Joins extend the snapshot in place; only leaves force a rebuild
+            self._online["users"].append(username)
+            self._online["count"] = len(self.members)
+
+    def remove_member(self, member: str) -> bool:
+        if self.members.pop(member, None) is None:
+            return False
+        self._online = None
+        return True
+
+    def online_snapshot(self) -> Dict:
+        if self._online is None:
+            users = list(self.members.values())
+            self._online = {"users": users, "count": len(users)}
+        return self._online
 
 
 class ConnectionManager:
+    """
+    Chat fan-out: each message is serialized once and queued to every
+    client, and a writer task per socket drains its own queue, so one slow
+    client never delays the others. A client whose queue overflows loses
+    frames; if its queue then stays backed up for CHAT_MAX_BEHIND seconds,
+    or a single send takes longer than CHAT_SEND_TIMEOUT, it is
+    disconnected.
+
+    Every connection belongs to one room (a topic). Rooms are created on
+    first join and dropped once nobody is left in them, history included,
+    and messages only fan out to the room they were sent in.
+
+    Room traffic is coalesced: messages, joins and leaves collect for
+    CHAT_BATCH_TICK and go out as one "batch" frame (or a plain frame when
+    there is just one), with joins and leaves summed into a single notice
+    each. A burst of N joins costs each client one frame per tick rather
+    than N, so a reconnect storm stays O(n) sends per tick.
+
+    Joins, leaves and messages are published as events on a backplane
+    (see chat_backplane.py). Every worker applies every event to its own
+    copy of presence and history and delivers it to its own sockets, so
+    several workers behave as one chat.
+    """
+
     def __init__(self):
-        self.active_connections: List[Dict] = []
-        self.message_history: List[Dict] = []
-        self.max_history = 100  # Keep last 100 messages
-    
-    async def connect(self, websocket: WebSocket, username: str):
+        self.node_id = f"{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:6]}"
+        self.backplane: Optional[LocalBackplane] = None
+        self.active_connections: Dict[WebSocket, ChatConnection] = {}  # This worker's sockets, every room
+        self.max_history = 100  # Keep last 100 messages per room
+        self.rooms: Dict[str, ChatRoom] = {}
+        self._sockets: Dict[str, WebSocket] = {}  # Member id -> socket, this worker only
+        self._nodes_seen: Dict[str, float] = {}  # Other workers -> when we last heard from them
+        self._member_ids = count(1)
+        self._dirty: Set[str] = set()  # Rooms with frames waiting for the tick
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+        self._tasks = set()
+        self._heartbeat = None
+
+    async def start(self, backplane: LocalBackplane = None):
+        """Attach to the configured backplane (CHAT_BACKPLANE) and sync with other workers"""
+        self.backplane = backplane or create_backplane()
+        await self.backplane.start(self.node_id, self._apply)
+        if self.backplane.shared:
+            await self._publish({"op": "hello"})
+            self._heartbeat = asyncio.create_task(self._heartbeat_loop())
+        logger.info(f"✅ Chat backplane: {type(self.backplane).__name__}")
+
+    async def stop(self):
+        if self._heartbeat:
+            self._heartbeat.cancel()
+            self._heartbeat = None
+        if self.backplane:
+            await self.backplane.stop()
+            self.backplane = None
+
+    def _room(self, name: str) -> ChatRoom:
+        """The room called `name`, created on first use"""
+        room = self.rooms.get(name)
+        if room is None:
+            room = self.rooms[name] = ChatRoom(name, self.max_history)
+        return room
+
+    def _drop_if_empty(self, room: ChatRoom):
+        if room.is_empty() and self.rooms.get(room.name) is room:
+            del self.rooms[room.name]
+
+    async def connect(self, websocket: WebSocket, username: str, room: str = DEFAULT_ROOM) -> str:
+        """Accept a socket into a room; returns the room's normalized name"""
         await websocket.accept()
-        connection = {
-            "websocket": websocket,
-            "username": username,
-            "connected_at": datetime.now().isoformat()
-        }
-        self.active_connections.append(connection)
-        
-        # Send message history to new user
-        if self.message_history:
-            await websocket.send_json({
+        name = normalize_room(room)
+        chat_room = self._room(name)
+        member = f"{self.node_id}/{next(self._member_ids)}"
+        connection = ChatConnection(websocket, username, member, name)
+        connection.writer = asyncio.create_task(self._writer(connection))
+        self.active_connections[websocket] = connection
+        chat_room.connections[websocket] = connection
+        self._sockets[member] = websocket
+
+        # Send message history to new user; messages still waiting for the
+        # tick are left out, they reach the newcomer with the batch
+        end = len(chat_room.history) - len(chat_room.pending)
+        if end > 0:
+            start = max(0, end - 50)
+            await self.send_personal_message({
                 "type": "history",
-                "messages": self.message_history[-50:]  # Last 50 messages
-            })
-        
+                "room": name,
+                "messages": list(islice(chat_room.history, start, end))  # Last 50 messages
+            }, websocket)
+
         # Notify others
-        await self.broadcast({
-            "type": "system",
-            "message": f"{username} joined the chat",
+        await self._publish({
+            "op": "join",
+            "room": name,
+            "member": member,
+            "username": username,
             "timestamp": datetime.now().isoformat(),
-            "online_count": len(self.active_connections)
-        }, exclude=websocket)
-    
+        })
+        return name
+
     def disconnect(self, websocket: WebSocket):
-        connection = next((c for c in self.active_connections if c["websocket"] == websocket), None)
+        connection = self.active_connections.pop(websocket, None)
         if connection:
-            self.active_connections.remove(connection)
-            return connection["username"]
+            self._sockets.pop(connection.member, None)
+            room = self.rooms.get(connection.room)
+            if room:
+                room.connections.pop(websocket, None)
+                self._drop_if_empty(room)
+            if connection.writer is not asyncio.current_task():
+                connection.writer.cancel()
+            return connection.username
         return None
-    
-    async def broadcast(self, message: dict, exclude: WebSocket = None):
-        """Send message to all connected clients"""
-        disconnected = []
-        for connection in self.active_connections:
-            if exclude and connection["websocket"] == exclude:
-                continue
+
+    async def leave(self, websocket: WebSocket):
+        """Disconnect a client and tell everyone else (no-op if already gone)"""
+        connection = self.active_connections.get(websocket)
+        if self.disconnect(websocket):
+            await self._publish({
+                "op": "leave",
+                "room": connection.room,
+                "member": connection.member,
+                "username": connection.username,
+                "timestamp": datetime.now().isoformat(),
+            })
+
+    async def post(self, message: dict, room: str = DEFAULT_ROOM):
+        """Store a chat message and deliver it to everyone in the room, on every worker"""
+        await self._publish({"op": "message", "room": normalize_room(room), "message": message})
+
+    async def _publish(self, event: dict):
+        event["node"] = self.node_id
+        if self.backplane is None:
+            await self._apply(event)  # Not started (no lifespan): behave as a single worker
+        else:
+            await self.backplane.publish(event)
+
+    async def _apply(self, event: dict):
+        """Apply one event from any worker, this one included"""
+        op = event["op"]
+        node = event["node"]
+        if node != self.node_id:
+            self._nodes_seen[node] = time.monotonic()
+
+        if op == "message":
+            room = self.rooms.get(event["room"])
+            if room:
+                room.history.append(event["message"])
+                self._queue(room, event["message"])
+        elif op == "join":
+            room = self._room(event["room"])
+            room.add_member(event["member"], event["username"])
+            self._queue_presence(room, event, 1)
+        elif op == "leave":
+            room = self.rooms.get(event["room"])
+            if room and room.remove_member(event["member"]):
+                self._queue_presence(room, event, -1)
+                self._drop_if_empty(room)
+        elif node == self.node_id:
+            return
+        elif op == "hello":
+            # A worker (re)started: tell it who is here and what was said
+            await self._publish({
+                "op": "sync",
+                "to": node,
+                "members": self._local_members(),
+                "history": {name: list(room.history) for name, room in self.rooms.items() if room.history},
+            })
+        elif op in ("sync", "presence"):
+            self._replace_members(node, event["members"])
+            if event.get("to") == self.node_id:
+                for name, messages in event["history"].items():
+                    room = self.rooms.get(name)
+                    if room and not room.history:
+                        room.history.extend(messages)
+
+    def _local_members(self) -> List[List[str]]:
+        return [[c.member, c.username, c.room] for c in self.active_connections.values()]
+
+    def _replace_members(self, node: str, members: List[List[str]]):
+        """Make `node`'s members exactly `members` (repairs any join/leave we missed)"""
+        prefix = f"{node}/"
+        for room in self.rooms.values():
+            for member in [m for m in room.members if m.startswith(prefix)]:
+                room.remove_member(member)
+        for member, username, room in members:
+            self._room(room).add_member(member, username)
+        for room in list(self.rooms.values()):
+            self._drop_if_empty(room)
+
+    async def _heartbeat_loop(self):
+        """Re-announce our members and forget workers that went quiet"""
+        while True:
+            await asyncio.sleep(CHAT_PRESENCE_INTERVAL)
             try:
-                await connection["websocket"].send_json(message)
-            except:
-                disconnected.append(connection)
-        
-        # Clean up disconnected clients
-        for conn in disconnected:
-            if conn in self.active_connections:
-                self.active_connections.remove(conn)
-    
+                await self._publish({"op": "presence", "members": self._local_members()})
+                cutoff = time.monotonic() - 3 * CHAT_PRESENCE_INTERVAL
+                for node in [n for n, seen in self._nodes_seen.items() if seen < cutoff]:
+                    logger.info(f"Chat: worker {node} went quiet, dropping its users")
+                    del self._nodes_seen[node]
+                    self._replace_members(node, [])
+            except Exception as e:
+                logger.error(f"Chat heartbeat failed: {e}")
+
+    def _enqueue(self, connection: ChatConnection, frame: str) -> bool:
+        """Queue a frame for one client; False once it has fallen too far behind"""
+        try:
+            connection.queue.put_nowait(frame)
+            return True
+        except asyncio.QueueFull:
+            connection.dropped += 1
+            now = time.monotonic()
+            if connection.behind_since is None:
+                connection.behind_since = now
+            return now - connection.behind_since <= CHAT_MAX_BEHIND
+
+    async def _writer(self, connection: ChatConnection):
+        """Drain one client's queue; cut the client off if sends stall or fail"""
+        websocket = connection.websocket
+        queue = connection.queue
+        try:
+            while True:
+                frame = await queue.get()
+                await asyncio.wait_for(websocket.send_text(frame), CHAT_SEND_TIMEOUT)
+                if queue.empty():
+                    connection.behind_since = None  # Caught up again
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.info(f"Chat: dropping {connection.username} ({type(e).__name__})")
+            await self._kick(connection)
+
+    async def _kick(self, connection: ChatConnection):
+        connection.closing = True
+        websocket = connection.websocket
+        await self.leave(websocket)
+        try:
+            await asyncio.wait_for(websocket.close(code=1008), CHAT_SEND_TIMEOUT)
+        except Exception:
+            pass
+
+    def _queue(self, room: ChatRoom, frame: dict):
+        """Send a frame to the room with the next batch (right away if batching is off)"""
+        if CHAT_BATCH_TICK <= 0:
+            self._fan_out(frame, room.connections)
+            return
+        room.pending.append(frame)
+        if len(room.pending) >= CHAT_BATCH_MAX:
+            self._flush_room(room)
+        else:
+            self._mark_dirty(room)
+
+    def _queue_presence(self, room: ChatRoom, event: dict, delta: int):
+        username = event["username"]
+        if CHAT_BATCH_TICK <= 0:
+            verb = "joined" if delta > 0 else "left"
+            self._fan_out({
+                "type": "system",
+                "message": f"{username} {verb} the chat",
+                "timestamp": event["timestamp"],
+                "online_count": len(room.members)
+            }, room.connections, exclude=self._sockets.get(event["member"]))
+            return
+        _, net = room.presence.get(event["member"], (username, 0))
+        room.presence[event["member"]] = (username, net + delta)
+        self._mark_dirty(room)
+
+    def _mark_dirty(self, room: ChatRoom):
+        self._dirty.add(room.name)
+        if self._flush_handle is None:
+            self._flush_handle = asyncio.get_running_loop().call_later(CHAT_BATCH_TICK, self._flush)
+
+    def _flush(self):
+        """Tick: send every room's pending batch"""
+        self._flush_handle = None
+        dirty, self._dirty = self._dirty, set()
+        for name in dirty:
+            room = self.rooms.get(name)
+            if room:
+                self._flush_room(room)
+
+    def _flush_room(self, room: ChatRoom):
+        frames, left, joined = room.take_batch()
+        names = [name for _, name in joined]
+        # Sockets here that joined this tick aren't told about themselves,
+        # as with unbatched notices; each gets its own copy of the batch
+        joiners = {}
+        for position, (member, _) in enumerate(joined):
+            websocket = self._sockets.get(member)
+            if websocket in room.connections:
+                joiners[websocket] = position
+
+        targets = room.connections
+        if joiners:
+            targets = {ws: c for ws, c in room.connections.items() if ws not in joiners}
+        self._send_frames(frames + room.presence_notices(left, names), targets)
+        for websocket, position in joiners.items():
+            others = names[:position] + names[position + 1:]
+            self._send_frames(frames + room.presence_notices(left, others),
+                              {websocket: room.connections[websocket]})
+
+    def _send_frames(self, frames: List[Dict], targets: Dict[WebSocket, ChatConnection]):
+        """Fan frames out as batches of at most CHAT_BATCH_MAX (a lone frame goes as is)"""
+        for start in range(0, len(frames), CHAT_BATCH_MAX):
+            chunk = frames[start:start + CHAT_BATCH_MAX]
+            self._fan_out(chunk[0] if len(chunk) == 1 else {"type": "batch", "messages": chunk}, targets)
+
+    async def broadcast(self, message: dict, exclude: WebSocket = None, room: str = None):
+        """Send message to this worker's clients in `room` (every room if None), unbatched"""
+        if room is None:
+            self._fan_out(message, self.active_connections, exclude)
+        elif room in self.rooms:
+            self._fan_out(message, self.rooms[room].connections, exclude)
+
+    def _fan_out(self, message: dict, targets: Dict[WebSocket, ChatConnection], exclude: WebSocket = None):
+        """Serialize once and queue the frame for every target"""
+        frame = orjson.dumps(message).decode()
+        too_slow = []
+        for websocket, connection in targets.items():
+            if connection.closing or websocket is exclude:
+                continue
+            if not self._enqueue(connection, frame):
+                too_slow.append(connection)
+
+        # Clean up clients that stopped keeping up
+        for conn in too_slow:
+            conn.closing = True
+            logger.info(f"Chat: dropping {conn.username} (send queue full)")
+            task = asyncio.create_task(self._kick(conn))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
     async def send_personal_message(self, message: dict, websocket: WebSocket):
         """Send message to specific client"""
-        await websocket.send_json(message)
-    
-    def add_to_history(self, message: dict):
-        """Store message in history"""
-        self.message_history.append(message)
-        if len(self.message_history) > self.max_history:
-            self.message_history.pop(0)
-    
-    def get_online_users(self) -> List[str]:
+        connection = self.active_connections.get(websocket)
+        if connection:
+            self._enqueue(connection, orjson.dumps(message).decode())
+
+    def get_online_snapshot(self, room: str = DEFAULT_ROOM) -> Dict:
+        """{"users": [...], "count": n} for a room across all workers, rebuilt only after someone leaves; don't mutate"""
+        chat_room = self.rooms.get(normalize_room(room))
+        return chat_room.online_snapshot() if chat_room else {"users": [], "count": 0}
+
+    def get_online_users(self, room: str = DEFAULT_ROOM) -> List[str]:
         """Get list of online usernames"""
-        return [conn["username"] for conn in self.active_connections]
+        return self.get_online_snapshot(room)["users"]
+
+    def get_rooms(self) -> List[Dict]:
+        """Open rooms, busiest first"""
+        rooms = [{"room": name, "count": len(room.members)} for name, room in self.rooms.items()]
+        return sorted(rooms, key=lambda r: r["count"], reverse=True)
 
 
 # Global connection manager
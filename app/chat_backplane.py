@@ -0,0 +1,241 @@
+# chat_backplane.py - Carry chat events between workers so they share one chat
+
+import os
+import fcntl
+import asyncio
+import logging
+from typing import Awaitable, Callable, Optional
+
+import orjson
+
+logger = logging.getLogger(__name__)
+
+CHAT_BACKPLANE = os.getenv("CHAT_BACKPLANE", "local")  # "local", "unix" or "redis"
+CHAT_BROKER_PATH = os.getenv("CHAT_BROKER_PATH", "/tmp/allcanlearn-chat.sock")  # Unix socket shared by workers on one host
+CHAT_REDIS_URL = os.getenv("CHAT_REDIS_URL", "redis://localhost:6379/0")
+CHAT_REDIS_CHANNEL = os.getenv("CHAT_REDIS_CHANNEL", "allcanlearn:chat")
+
+BROKER_LINE_LIMIT = 16 * 1024 * 1024  # Presence and history syncs can be long lines
+BROKER_MAX_BUFFER = 16 * 1024 * 1024  # A peer this far behind is dropped; it reconnects and resyncs
+RECONNECT_DELAY = 1.0
+
+Deliver = Callable[[dict], Awaitable[None]]
+
+
+class LocalBackplane:
+    """
+    Single worker: events go straight back to this process' manager.
+
+    Every backplane delivers each published event exactly once on every
+    worker, the publishing one included (immediately, before publish()
+    returns), so the manager handles local and remote events the same way.
+    """
+
+    shared = False  # Whether other workers can see our events
+
+    async def start(self, node: str, deliver: Deliver):
+        self.node = node
+        self._deliver = deliver
+
+    async def publish(self, event: dict):
+        await self._deliver(event)
+
+    async def stop(self):
+        pass
+
+    async def _dispatch(self, event: dict):
+        try:
+            await self._deliver(event)
+        except Exception as e:
+            logger.error(f"Chat backplane: failed to apply {event.get('op')} event: {e}")
+
+
+class UnixSocketBackplane(LocalBackplane):
+    """
+    Workers on one host share events over a Unix socket, no extra service
+    needed. The worker holding `<path>.lock` is the hub: it binds the socket
+    and relays every line to the other workers, which connect to it. If the
+    hub exits, the rest reconnect and one of them takes the lock over.
+    """
+
+    shared = True
+
+    def __init__(self, path: str = CHAT_BROKER_PATH):
+        self.path = path
+        self._lock_file = None
+        self._server = None
+        self._peers = set()
+        self._upstream: Optional[asyncio.StreamWriter] = None
+        self._task = None
+
+    async def start(self, node: str, deliver: Deliver):
+        await super().start(node, deliver)
+        self._linked = asyncio.Event()
+        self._task = asyncio.create_task(self._run())
+        try:
+            await asyncio.wait_for(self._linked.wait(), 5)
+        except asyncio.TimeoutError:
+            logger.warning(f"Chat broker: {self.path} not reachable yet, retrying in the background")
+
+    def _try_lock(self) -> bool:
+        lock_file = open(f"{self.path}.lock", "a")
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            lock_file.close()
+            return False
+        self._lock_file = lock_file
+        return True
+
+    async def _run(self):
+        while True:
+            try:
+                if self._try_lock():
+                    # Any socket file still there was left by a dead hub; this replaces it
+                    self._server = await asyncio.start_unix_server(
+                        self._serve_peer, self.path, limit=BROKER_LINE_LIMIT)
+                    logger.info(f"Chat broker: serving as hub on {self.path}")
+                    self._linked.set()
+                    await self._server.serve_forever()
+
+                reader, self._upstream = await asyncio.open_unix_connection(
+                    self.path, limit=BROKER_LINE_LIMIT)
+                logger.info(f"Chat broker: connected to hub on {self.path}")
+                self._linked.set()
+                await self._read(reader)
+                logger.warning("Chat broker: hub went away, reconnecting")
+            except (OSError, ValueError) as e:
+                # Hub not listening yet, or the link broke
+                logger.debug(f"Chat broker: {e}")
+            finally:
+                if self._upstream is not None:
+                    self._upstream.close()
+                    self._upstream = None
+                if self._server is None and self._lock_file is not None:
+                    self._lock_file.close()  # Couldn't bind; let someone else try
+                    self._lock_file = None
+            await asyncio.sleep(RECONNECT_DELAY)
+
+    async def _serve_peer(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self._peers.add(writer)
+        try:
+            await self._read(reader, source=writer)
+        except (OSError, ValueError):
+            pass
+        finally:
+            self._peers.discard(writer)
+            writer.close()
+
+    async def _read(self, reader: asyncio.StreamReader, source: asyncio.StreamWriter = None):
+        """Apply each line until EOF; the hub also relays it to everyone but its sender"""
+        while True:
+            line = await reader.readline()
+            if not line:
+                return
+            if self._server is not None:
+                self._relay(line, exclude=source)
+            await self._dispatch(orjson.loads(line))
+
+    def _relay(self, line: bytes, exclude: asyncio.StreamWriter = None):
+        for peer in list(self._peers):
+            if peer is exclude or peer.is_closing():
+                continue
+            if peer.transport.get_write_buffer_size() > BROKER_MAX_BUFFER:
+                logger.warning("Chat broker: dropping a worker that stopped reading")
+                self._peers.discard(peer)
+                peer.close()
+                continue
+            peer.write(line)
+
+    async def publish(self, event: dict):
+        line = orjson.dumps(event) + b"\n"
+        if self._server is not None:
+            self._relay(line)
+        elif self._upstream is not None and not self._upstream.is_closing():
+            self._upstream.write(line)
+        else:
+            logger.debug(f"Chat broker: not linked, {event.get('op')} event stays local")
+        await self._deliver(event)
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+        for peer in list(self._peers):
+            peer.close()
+        self._peers.clear()
+        if self._server is not None:
+            self._server.close()
+            self._server = None
+        if self._lock_file is not None:
+            self._lock_file.close()  # Releases the lock for the next hub
+            self._lock_file = None
+
+
+class RedisBackplane(LocalBackplane):
+    """Workers on any number of hosts share a Redis pub/sub channel (needs the 'redis' package)"""
+
+    shared = True
+
+    def __init__(self, url: str = CHAT_REDIS_URL, channel: str = CHAT_REDIS_CHANNEL):
+        self.url = url
+        self.channel = channel
+        self._redis = None
+        self._task = None
+
+    async def start(self, node: str, deliver: Deliver):
+        await super().start(node, deliver)
+        try:
+            import redis.asyncio as aioredis
+        except ImportError:
+            raise RuntimeError("CHAT_BACKPLANE=redis needs the redis package: pip install 'redis>=5'")
+        self._redis = aioredis.from_url(self.url)
+        self._task = asyncio.create_task(self._listen())
+
+    async def _listen(self):
+        while True:
+            pubsub = self._redis.pubsub()
+            try:
+                await pubsub.subscribe(self.channel)
+                async for message in pubsub.listen():
+                    if message["type"] != "message":
+                        continue
+                    event = orjson.loads(message["data"])
+                    if event.get("node") != self.node:  # Ours were applied on publish
+                        await self._dispatch(event)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Chat redis: {e}, resubscribing")
+            finally:
+                await pubsub.aclose()
+            await asyncio.sleep(RECONNECT_DELAY)
+
+    async def publish(self, event: dict):
+        try:
+            await self._redis.publish(self.channel, orjson.dumps(event))
+        except Exception as e:
+            logger.warning(f"Chat redis: publish failed ({e}), {event.get('op')} event stays local")
+        await self._deliver(event)
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+        if self._redis is not None:
+            await self._redis.aclose()
+            self._redis = None
+
+
+BACKPLANES = {
+    "local": LocalBackplane,
+    "unix": UnixSocketBackplane,
+    "redis": RedisBackplane,
+}
+
+
+def create_backplane(kind: str = None) -> LocalBackplane:
+    kind = (kind or CHAT_BACKPLANE).lower()
+    if kind not in BACKPLANES:
+        raise ValueError(f"Unknown CHAT_BACKPLANE: {kind} (expected one of {', '.join(BACKPLANES)})")
+    return BACKPLANES[kind]()
@@ -4,11 +4,15 @@ import os
 import time
 from datetime import datetime, timedelta
 import logging
+from app.tts_client import CACHE_STATS
 
 logger = logging.getLogger(__name__)
 
 RETENTION_DAYS = 30
 
+# Size cap for the content-addressed TTS cache (least recently used go first)
+TTS_CACHE_MAX_BYTES = int(os.getenv("TTS_CACHE_MAX_BYTES", str(2 * 1024 ** 3)))
+
 
 def cleanup_old_audio_files(folder="tts_output"):
     """Delete audio files older than RETENTION_DAYS"""
@@ -33,3 +37,41 @@ def cleanup_old_audio_files(folder="tts_output"):
         
     except Exception as e:
         logger.error(f"Error during cleanup: {e}")
+    
+    evict_tts_cache(folder)
+
+
+def evict_tts_cache(folder="tts_output", max_bytes=None):
+    """Delete least recently used audio files until the folder fits max_bytes"""
+    if max_bytes is None:
+        max_bytes = TTS_CACHE_MAX_BYTES
+    if not os.path.exists(folder):
+        return
+    
+    try:
+        files = []
+        total_size = 0
+        for entry in os.scandir(folder):
+            if entry.is_file() and not entry.name.startswith("."):
+                stat = entry.stat()
+                files.append((stat.st_mtime, stat.st_size, entry.path))
+                total_size += stat.st_size
+        
+        if total_size <= max_bytes:
+            return
+        
+        # Cache hits bump mtime, so oldest mtime = least recently used
+        files.sort()
+        evicted = 0
+        for _, size, filepath in files:
+            if total_size <= max_bytes:
+                break
+            os.remove(filepath)
+            total_size -= size
+            evicted += 1
+        
+        CACHE_STATS["evictions"] += evicted
+        logger.info(f"TTS cache eviction: {evicted} files deleted, {total_size} bytes kept")
+    
+    except Exception as e:
+        logger.error(f"Error during TTS cache eviction: {e}")
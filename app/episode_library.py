@@ -0,0 +1,111 @@
+# episode_library.py - Keep a few fresh episodes per topic ready ahead of requests
+
+import os
+import asyncio
+import logging
+from datetime import datetime, timedelta
+from typing import List, Optional, Tuple
+
+from app.moderator import TOPIC_REGISTRY
+from app.episodes import count_recent_episodes
+from app.jobs import job_manager, QueueFullError, DONE
+
+logger = logging.getLogger(__name__)
+
+EPISODE_LIBRARY_SIZE = int(os.getenv("EPISODE_LIBRARY_SIZE", "3"))  # Fresh episodes wanted per topic; 0 disables
+EPISODE_LIBRARY_MAX_AGE_HOURS = float(os.getenv("EPISODE_LIBRARY_MAX_AGE_HOURS", "24"))  # Older ones don't count
+EPISODE_LIBRARY_HOURS = os.getenv("EPISODE_LIBRARY_HOURS", "1-6")  # Local off-peak hours, start-end; empty = any time
+EPISODE_LIBRARY_MAX_LOAD = float(os.getenv("EPISODE_LIBRARY_MAX_LOAD", "0.5"))  # 1-minute load average per CPU
+EPISODE_LIBRARY_BATCH = int(os.getenv("EPISODE_LIBRARY_BATCH", "2"))  # Episodes per run at most
+EPISODE_LIBRARY_MINUTES = int(os.getenv("EPISODE_LIBRARY_MINUTES", "15"))  # Minutes between runs
+
+_running = False
+
+
+def in_off_peak(hour: int, window: str = None) -> bool:
+    """Whether `hour` falls in a 'start-end' window (end exclusive, may wrap midnight)"""
+    window = EPISODE_LIBRARY_HOURS if window is None else window
+    if not window.strip():
+        return True
+    start, end = (int(part) for part in window.split("-"))
+    if start <= end:
+        return start <= hour < end
+    return hour >= start or hour < end
+
+
+def load_per_cpu() -> Optional[float]:
+    try:
+        return os.getloadavg()[0] / (os.cpu_count() or 1)
+    except (AttributeError, OSError):
+        return None  # Not available on this platform
+
+
+def render_blocked() -> Optional[str]:
+    """Why the library shouldn't render right now, or None if it can"""
+    if not in_off_peak(datetime.now().hour):
+        return f"outside off-peak hours {EPISODE_LIBRARY_HOURS}"
+    if not job_manager.is_idle():
+        return "live generation in progress"
+    load = load_per_cpu()
+    if load is not None and load > EPISODE_LIBRARY_MAX_LOAD:
+        return f"load {load:.2f}/CPU above {EPISODE_LIBRARY_MAX_LOAD}"
+    return None
+
+
+def library_deficits() -> List[Tuple[str, int]]:
+    """(topic_type, missing episodes) for each topic short of EPISODE_LIBRARY_SIZE, most missing first"""
+    since = (datetime.now() - timedelta(hours=EPISODE_LIBRARY_MAX_AGE_HOURS)).isoformat()
+    deficits = []
+    for key, topic in TOPIC_REGISTRY.items():
+        missing = EPISODE_LIBRARY_SIZE - count_recent_episodes(topic.topic, since)
+        if missing > 0:
+            deficits.append((key, missing))
+    return sorted(deficits, key=lambda item: item[1], reverse=True)
+
+
+async def fill_episode_library(max_episodes: int = EPISODE_LIBRARY_BATCH) -> int:
+    """
+    Render up to `max_episodes` episodes for the topics furthest below target.
+
+    Episodes go through the regular generation queue, one at a time, and
+    the CPU budget is re-checked before each one, so live traffic arriving
+    mid-run stops the library from starting more.
+    """
+    global _running
+    if _running or EPISODE_LIBRARY_SIZE <= 0:
+        return 0
+
+    _running = True
+    made = 0
+    try:
+        for _ in range(max_episodes):
+            reason = render_blocked()
+            if reason:
+                logger.debug(f"Episode library idle: {reason}")
+                break
+
+            deficits = await asyncio.to_thread(library_deficits)
+            if not deficits:
+                break
+            topic_type, missing = deficits[0]
+
+            try:
+                job = job_manager.submit(topic_type, tts_enabled=True)
+            except QueueFullError:
+                break
+            await job.wait()
+
+            if job.state != DONE:
+                logger.warning(f"Episode library: {topic_type} episode {job.state}: {job.error}")
+                break
+            if not any(turn.get("tts") for turn in job.episode["turns"]):
+                # Silent episodes don't count toward the target, so more runs
+                # would only spend Groq budget on the same deficit
+                logger.warning(f"Episode library: {topic_type} episode has no audio (is espeak-ng "
+                               f"working?); stopping until the next run")
+                break
+            made += 1
+            logger.info(f"Episode library: rendered {topic_type} ({missing - 1} still missing)")
+        return made
+    finally:
+        _running = False
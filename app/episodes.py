@@ -2,102 +2,366 @@
 
 import os
 import json
+import time
+import base64
+import hashlib
+import sqlite3
+import threading
+import orjson
 from datetime import datetime
-from typing import List
-from pathlib import Path
+from typing import List, Optional, Tuple
 
-EPISODES_FILE = "episodes.json"
+EPISODES_FILE = "episodes.json"  # Legacy JSON store, imported once into SQLite
+EPISODES_DB = os.getenv("EPISODES_DB", "episodes_data/episodes.db")
 TTS_OUTPUT_DIR = "tts_output"
 
+EPISODE_FIELDS = ("id", "topic", "created_at", "turns_count", "audio_files", "audio_track", "segments")
+# Paginated lists leave out the (large) audio_files and segments arrays unless asked for
+LIST_FIELDS = ("id", "topic", "created_at", "turns_count", "audio_track")
+# Stored as JSON text
+JSON_FIELDS = ("audio_files", "segments")
 
-def load_episodes() -> dict:
-    """Load episodes metadata"""
-    if os.path.exists(EPISODES_FILE):
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS episodes (
+    id TEXT PRIMARY KEY,
+    topic TEXT NOT NULL,
+    created_at TEXT NOT NULL,
+    turns_count INTEGER NOT NULL DEFAULT 0,
+    audio_files TEXT NOT NULL DEFAULT '[]',
+    audio_track TEXT,
+    segments TEXT NOT NULL DEFAULT '[]'
+);
+CREATE INDEX IF NOT EXISTS idx_episodes_topic ON episodes (topic, created_at);
+CREATE INDEX IF NOT EXISTS idx_episodes_created_at ON episodes (created_at);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+# Columns added after the first release: (name, definition)
+MIGRATIONS = [
+    ("audio_track", "TEXT"),
+    ("segments", "TEXT NOT NULL DEFAULT '[]'"),
+]
+
+# One connection per thread: sync endpoints run in FastAPI's threadpool
+_local = threading.local()
+_init_lock = threading.Lock()
+_initialized = False
+
+
+def get_connection() -> sqlite3.Connection:
+    """Get this thread's SQLite connection, creating the schema on first use"""
+    global _initialized
+    conn = getattr(_local, "conn", None)
+    if conn is None:
+        db_dir = os.path.dirname(EPISODES_DB)
+        if db_dir:
+            os.makedirs(db_dir, exist_ok=True)
+        conn = sqlite3.connect(EPISODES_DB, timeout=30, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        # WAL lets readers run while an episode is being written
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        _local.conn = conn
+
+    if not _initialized:
+        with _init_lock:
+            if not _initialized:
+                conn.executescript(SCHEMA)
+                migrate(conn)
+                import_json_episodes(conn)
+                _initialized = True
+    return conn
+
+
+def migrate(conn: sqlite3.Connection):
+    """Add columns missing from databases created by older versions"""
+    existing = {row["name"] for row in conn.execute("PRAGMA table_info(episodes)")}
+    for column, definition in MIGRATIONS:
+        if column not in existing:
+            try:
+                conn.execute(f"ALTER TABLE episodes ADD COLUMN {column} {definition}")
+            except sqlite3.OperationalError:
+                pass  # Another worker added it first
+
+
+def load_json_episodes(path: Optional[str] = None) -> dict:
+    """Load episodes metadata from the legacy JSON file"""
+    path = path or EPISODES_FILE
+    if os.path.exists(path):
         try:
-            with open(EPISODES_FILE, 'r') as f:
+            with open(path, 'r') as f:
                 return json.load(f)
         except:
             return {}
     return {}
 
 
-def save_episodes(episodes: dict):
-    """Save episodes metadata"""
-    with open(EPISODES_FILE, 'w') as f:
-        json.dump(episodes, f, indent=2)
+def import_json_episodes(conn: sqlite3.Connection, path: Optional[str] = None) -> int:
+    """One-time import of the legacy episodes.json into SQLite"""
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        done = conn.execute("SELECT value FROM meta WHERE key = 'json_imported'").fetchone()
+        if done:
+            conn.execute("COMMIT")
+            return 0
+
+        rows = [
+            (
+                str(ep.get("id", episode_id)),
+                ep.get("topic", "Unknown"),
+                ep.get("created_at", ""),
+                ep.get("turns_count", 0),
+                json.dumps(ep.get("audio_files", []) or []),
+            )
+            for episode_id, ep in load_json_episodes(path).items()
+            if isinstance(ep, dict)
+        ]
+        conn.executemany(
+            "INSERT OR IGNORE INTO episodes (id, topic, created_at, turns_count, audio_files) "
+            "VALUES (?, ?, ?, ?, ?)",
+            rows,
+        )
+        conn.execute(
+            "INSERT INTO meta (key, value) VALUES ('json_imported', ?)",
+            (datetime.now().isoformat(),),
+        )
+        conn.execute("COMMIT")
+        return len(rows)
+    except Exception:
+        conn.execute("ROLLBACK")
+        raise
 
 
-def add_episode(topic: str, turns: list) -> str:
+def row_to_episode(row: sqlite3.Row, fields=EPISODE_FIELDS) -> dict:
+    episode = {field: row[field] for field in fields}
+    for field in JSON_FIELDS:
+        if field in episode:
+            episode[field] = json.loads(episode[field])
+    return episode
+
+
+def add_episode(topic: str, turns: list, audio_track: Optional[str] = None,
+                segments: Optional[list] = None) -> str:
     """Add a new episode and return episode ID"""
-    episode_id = str(int(datetime.now().timestamp() * 1000))
-    
-    episodes = load_episodes()
-    # Extract audio file paths - speak_text returns just filename
-    # Prepend /tts_output/ for web access
+    segments = segments or []
+    now = datetime.now()
+    episode_id = int(now.timestamp() * 1000)
+
+    # Turn tts values are web paths (/tts_output/<file>) from the moderator;
+    # bare filenames still get the prefix
     audio_files = []
     for turn in turns:
         if turn.get("tts"):
             filename = turn.get("tts")
-            # Filename only, prepend /tts_output/
-            audio_files.append(f"/tts_output/{filename}")
-    
-    episodes[episode_id] = {
-        "id": episode_id,
+            if not filename.startswith("/tts_output/"):
+                filename = f"/tts_output/{filename}"
+            audio_files.append(filename)
+
+    conn = get_connection()
+    while True:
+        try:
+            cursor = conn.execute(
+                "INSERT INTO episodes (id, topic, created_at, turns_count, audio_files, "
+                "audio_track, segments) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (str(episode_id), topic, now.isoformat(), len(turns), json.dumps(audio_files),
+                 audio_track, json.dumps(segments)),
+            )
+            break
+        except sqlite3.IntegrityError:
+            # Another episode was stored in the same millisecond
+            episode_id += 1
+
+    episode_index.add({
+        "id": str(episode_id),
         "topic": topic,
-        "created_at": datetime.now().isoformat(),
+        "created_at": now.isoformat(),
         "turns_count": len(turns),
-        "audio_files": audio_files
-    }
+        "audio_files": audio_files,
+        "audio_track": audio_track,
+        "segments": segments,
+    }, cursor.lastrowid)
+    return str(episode_id)
+
+
+def load_latest_per_topic(conn: sqlite3.Connection) -> List[dict]:
+    """Query one episode per topic: the newest with audio, else the newest."""
+    topics = [row["topic"] for row in conn.execute("SELECT DISTINCT topic FROM episodes")]
+
+    # Both lookups walk the (topic, created_at) index from the newest end
+    latest = []
+    for topic in topics:
+        row = conn.execute(
+            "SELECT * FROM episodes WHERE topic = ? AND audio_files != '[]' "
+            "ORDER BY created_at DESC LIMIT 1",
+            (topic,),
+        ).fetchone() or conn.execute(
+            "SELECT * FROM episodes WHERE topic = ? ORDER BY created_at DESC LIMIT 1",
+            (topic,),
+        ).fetchone()
+        latest.append(row_to_episode(row))
+    return latest
+
+
+class EpisodeIndex:
+    """
+    Process-wide newest-first, deduped-by-topic view of the episode store.
     
-    save_episodes(episodes)
-    return episode_id
+    add_episode updates it incrementally; the JSON body and its ETag are
+    built once per change and reused until the next one. Episodes written
+    by another worker process are picked up by comparing MAX(rowid).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._best_by_topic = None
+        self._max_rowid = None
+        self._episodes = None
+        self._snapshot = None
+
+    def _has_audio(self, episode: dict) -> bool:
+        return bool(episode.get("audio_files"))
+
+    def _invalidate(self):
+        self._episodes = None
+        self._snapshot = None
+
+    def _ensure_fresh(self, conn: sqlite3.Connection):
+        max_rowid = conn.execute("SELECT MAX(rowid) FROM episodes").fetchone()[0]
+        if self._best_by_topic is None or max_rowid != self._max_rowid:
+            self._best_by_topic = {ep["topic"]: ep for ep in load_latest_per_topic(conn)}
+            self._max_rowid = max_rowid
+            self._invalidate()
+
+    def add(self, episode: dict, rowid: int):
+        """Fold a newly stored episode into the view"""
+        with self._lock:
+            if self._best_by_topic is None:
+                return  # Not built yet; the first read loads everything
+
+            # A new episode is the newest for its topic; it wins unless it
+            # has no audio and the current pick does
+            current = self._best_by_topic.get(episode["topic"])
+            if current is None or self._has_audio(episode) or not self._has_audio(current):
+                self._best_by_topic[episode["topic"]] = episode
+                self._invalidate()
+
+            if self._max_rowid is None or rowid == self._max_rowid + 1:
+                self._max_rowid = rowid
+            else:
+                # Missed writes from another process; rebuild on next read
+                self._best_by_topic = None
+
+    def _sorted(self) -> List[dict]:
+        if self._episodes is None:
+            self._episodes = sorted(
+                self._best_by_topic.values(),
+                key=lambda x: x.get("created_at", ""),
+                reverse=True
+            )
+        return self._episodes
+
+    def episodes(self) -> List[dict]:
+        """Deduped episodes, newest first"""
+        conn = get_connection()
+        with self._lock:
+            self._ensure_fresh(conn)
+            return self._sorted()
+
+    def snapshot(self) -> Tuple[bytes, str, float]:
+        """Serialized {"episodes": [...]} body, its ETag and last change time"""
+        conn = get_connection()
+        with self._lock:
+            self._ensure_fresh(conn)
+            if self._snapshot is None:
+                body = orjson.dumps({"episodes": self._sorted()})
+                etag = '"' + hashlib.sha1(body).hexdigest()[:16] + '"'
+                self._snapshot = (body, etag, time.time())
+            return self._snapshot
+
+
+episode_index = EpisodeIndex()
 
 
 def get_all_episodes() -> List[dict]:
     """Get all episodes sorted by date (newest first), deduped by topic."""
-    episodes = load_episodes()
-
-    # Sort newest first
-    sorted_episodes = sorted(
-        episodes.values(),
-        key=lambda x: x.get("created_at", ""),
-        reverse=True
-    )
-
-    # Deduplicate by topic, prefer entries with audio
-    best_by_topic = {}
-    for ep in sorted_episodes:
-        topic = ep.get("topic", "Unknown")
-        current = best_by_topic.get(topic)
-        if not current:
-            best_by_topic[topic] = ep
-            continue
-
-        current_audio = len(current.get("audio_files", []) or [])
-        ep_audio = len(ep.get("audio_files", []) or [])
-
-        # Prefer episodes that actually have audio files
-        if ep_audio > 0 and current_audio == 0:
-            best_by_topic[topic] = ep
-
-    # Return in newest-first order while keeping only one per topic
-    deduped = []
-    added = set()
-    for ep in sorted_episodes:
-        topic = ep.get("topic", "Unknown")
-        if topic in added:
-            continue
-        if best_by_topic.get(topic) == ep:
-            deduped.append(ep)
-            added.add(topic)
-
-    return deduped
-
-
-def get_episode(episode_id: str) -> dict:
+    return list(episode_index.episodes())
+
+
+def get_episode(episode_id: str) -> Optional[dict]:
     """Get a specific episode"""
-    episodes = load_episodes()
-    return episodes.get(episode_id)
+    row = get_connection().execute(
+        "SELECT * FROM episodes WHERE id = ?", (episode_id,)
+    ).fetchone()
+    return row_to_episode(row) if row else None
+
+
+def count_recent_episodes(topic: str, since: str) -> int:
+    """Episodes with audio for a topic created at or after `since` (ISO time)"""
+    return get_connection().execute(
+        "SELECT COUNT(*) FROM episodes WHERE topic = ? AND created_at >= ? AND audio_files != '[]'",
+        (topic, since),
+    ).fetchone()[0]
+
+
+def encode_cursor(episode: dict) -> str:
+    raw = json.dumps([episode["created_at"], episode["id"]]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[str, str]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, episode_id = json.loads(base64.urlsafe_b64decode(padded))
+        return str(created_at), str(episode_id)
+    except Exception:
+        raise ValueError("Invalid cursor")
+
+
+def list_episodes(
+    limit: int = 20,
+    cursor: Optional[str] = None,
+    topic: Optional[str] = None,
+    fields: Optional[List[str]] = None,
+) -> dict:
+    """
+    Page through all episodes, newest first.
+    
+    Keyset pagination on (created_at, id): each page is an index range scan
+    no matter how deep it is. Pass the returned next_cursor to get the
+    following page; it is None on the last page.
+    """
+    fields = tuple(fields) if fields else LIST_FIELDS
+    unknown = [field for field in fields if field not in EPISODE_FIELDS]
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(unknown)}")
+
+    # created_at and id are always read to build the next cursor
+    columns = sorted(set(fields) | {"id", "created_at"}, key=EPISODE_FIELDS.index)
+    query = f"SELECT {', '.join(columns)} FROM episodes"
+    conditions, params = [], []
+    if topic:
+        conditions.append("topic = ?")
+        params.append(topic)
+    if cursor:
+        created_at, episode_id = decode_cursor(cursor)
+        conditions.append("(created_at < ? OR (created_at = ? AND id < ?))")
+        params.extend([created_at, created_at, episode_id])
+    if conditions:
+        query += " WHERE " + " AND ".join(conditions)
+    query += " ORDER BY created_at DESC, id DESC LIMIT ?"
+    params.append(limit + 1)
+
+    rows = get_connection().execute(query, params).fetchall()
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+
+    return {
+        "episodes": [row_to_episode(row, fields) for row in rows],
+        "next_cursor": encode_cursor(rows[-1]) if has_more else None,
+    }
 
 
 def get_audio_files():
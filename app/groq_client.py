@@ -1,13 +1,254 @@
 # groq_client.py
 
 import os
+import re
+import json
+import time
+import random
+import asyncio
+import logging
+from collections import OrderedDict, deque
+
 import httpx
 
-GROQ_URL = "https://api.groq.com/openai/v1/chat/completions"
+logger = logging.getLogger(__name__)
+
+GROQ_URL = os.getenv("GROQ_URL", "https://api.groq.com/openai/v1/chat/completions")
 MODEL = "llama-3.1-8b-instant"
 
+# Shared connection pool settings (override via environment)
+GROQ_TIMEOUT = float(os.getenv("GROQ_TIMEOUT", "60"))
+GROQ_MAX_CONNECTIONS = int(os.getenv("GROQ_MAX_CONNECTIONS", "20"))
+GROQ_MAX_KEEPALIVE = int(os.getenv("GROQ_MAX_KEEPALIVE", "10"))
+GROQ_KEEPALIVE_EXPIRY = float(os.getenv("GROQ_KEEPALIVE_EXPIRY", "30"))
+
+# Client-side rate limits (Groq free tier for llama-3.1-8b-instant); the
+# x-ratelimit-* response headers tighten these at runtime
+GROQ_RPM = int(os.getenv("GROQ_RPM", "30"))
+GROQ_TPM = int(os.getenv("GROQ_TPM", "6000"))
+# Worker processes sharing the account (uvicorn reads WEB_CONCURRENCY as --workers);
+# each one admits an equal share of GROQ_RPM/GROQ_TPM
+GROQ_WORKERS = max(1, int(os.getenv("GROQ_WORKERS", os.getenv("WEB_CONCURRENCY", "1"))))
+GROQ_MAX_RETRIES = int(os.getenv("GROQ_MAX_RETRIES", "4"))
+GROQ_BACKOFF_BASE = float(os.getenv("GROQ_BACKOFF_BASE", "0.5"))
+GROQ_BACKOFF_MAX = float(os.getenv("GROQ_BACKOFF_MAX", "20"))
+# Completion tokens assumed before the response reports real usage
+GROQ_COMPLETION_ESTIMATE = int(os.getenv("GROQ_COMPLETION_ESTIMATE", "600"))
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+# HTTP/2 needs the optional 'h2' package (installed via httpx[http2])
+try:
+    import h2  # noqa: F401
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+_client = None
+
+
+def get_client() -> httpx.AsyncClient:
+    """Return the process-wide keep-alive client, creating it on first use"""
+    global _client
+    if _client is None or _client.is_closed:
+        _client = httpx.AsyncClient(
+            http2=HTTP2_AVAILABLE,
+            timeout=GROQ_TIMEOUT,
+            limits=httpx.Limits(
+                max_connections=GROQ_MAX_CONNECTIONS,
+                max_keepalive_connections=GROQ_MAX_KEEPALIVE,
+                keepalive_expiry=GROQ_KEEPALIVE_EXPIRY,
+            ),
+        )
+    return _client
+
+
+async def close_client():
+    """Close the shared client (called from the app lifespan on shutdown)"""
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
+
+def parse_reset(value):
+    """Seconds from a reset header like '7.66s', '2m59.56s' or '120ms'"""
+    if not value:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    units = {"h": 3600, "m": 60, "s": 1, "ms": 0.001}
+    parts = re.findall(r"(\d+(?:\.\d+)?)(ms|h|m|s)", value)
+    if not parts:
+        return None
+    return sum(float(amount) * units[unit] for amount, unit in parts)
+
+
+def estimate_tokens(messages):
+    """Rough prompt size (~4 chars per token) plus the expected completion"""
+    chars = sum(len(m.get("content", "")) for m in messages)
+    return chars // 4 + GROQ_COMPLETION_ESTIMATE
+
+
+class GroqScheduler:
+    """
+    Admits Groq requests within requests-per-minute and tokens-per-minute
+    budgets.
+    
+    Waiting callers are queued per caller name ("roundtable", "quiz", ...)
+    and served round-robin, so a burst of episodes can't starve quizzes.
+    The budgets follow a 60s sliding window of admitted requests, tightened
+    by the x-ratelimit-* headers and paused entirely after a retry-after.
+    With several workers, each admits 1/workers of the account limits.
+    """
+
+    def __init__(self, rpm: int = GROQ_RPM, tpm: int = GROQ_TPM, workers: int = GROQ_WORKERS):
+        self.workers = workers
+        self.rpm = max(1, rpm // workers)
+        self.tpm = max(1, tpm // workers)
+        self.queues: "OrderedDict[str, deque]" = OrderedDict()
+        self.window = deque()  # [admitted_at, tokens] of the last 60s
+        self.blocked_until = 0.0
+        self.remaining_tokens = None
+        self.tokens_reset_at = 0.0
+        self._timer = None
+        self.stats = {"admitted": 0, "retries": 0, "rate_limited": 0, "failed": 0, "waited": 0.0}
+
+    async def acquire(self, caller: str, tokens: int) -> list:
+        """Wait for a slot; returns the grant to pass to settle()"""
+        future = asyncio.get_running_loop().create_future()
+        self.queues.setdefault(caller, deque()).append((future, tokens))
+        started = time.monotonic()
+        self._dispatch()
+        grant = await future
+        self.stats["waited"] += time.monotonic() - started
+        return grant
+
+    def settle(self, grant: list, used_tokens):
+        """Replace a grant's estimate with the tokens the response reported"""
+        if used_tokens:
+            grant[1] = used_tokens
+        self._dispatch()
+
+    def _prune(self, now: float):
+        while self.window and now - self.window[0][0] >= 60:
+            self.window.popleft()
+
+    def _delay(self, now: float, tokens: int) -> float:
+        """Seconds until a request of this size fits every budget"""
+        if now < self.blocked_until:
+            return self.blocked_until - now
+        if len(self.window) >= self.rpm:
+            return self.window[0][0] + 60 - now
+        if self.remaining_tokens is not None and now < self.tokens_reset_at \
+                and tokens > self.remaining_tokens:
+            return self.tokens_reset_at - now
+
+        excess = sum(grant[1] for grant in self.window) + tokens - self.tpm
+        for admitted_at, used in self.window:
+            if excess <= 0:
+                break
+            excess -= used
+            if excess <= 0:
+                return admitted_at + 60 - now
+        if excess > 0 and self.window:
+            # Larger than the whole budget: wait for the window to drain
+            return self.window[-1][0] + 60 - now
+        return 0.0
+
+    def _dispatch(self):
+        loop = asyncio.get_running_loop()
+        while self.queues:
+            caller, waiting = next(iter(self.queues.items()))
+            future, tokens = waiting[0]
+            if future.done():  # cancelled while queued
+                waiting.popleft()
+                if not waiting:
+                    del self.queues[caller]
+                continue
+
+            now = loop.time()
+            self._prune(now)
+            delay = self._delay(now, tokens)
+            if delay > 0:
+                self._wake_in(loop, delay)
+                return
 
-async def call_groq(messages):
+            waiting.popleft()
+            if waiting:
+                self.queues.move_to_end(caller)
+            else:
+                del self.queues[caller]
+
+            grant = [now, tokens]
+            self.window.append(grant)
+            if self.remaining_tokens is not None:
+                self.remaining_tokens -= tokens
+            self.stats["admitted"] += 1
+            future.set_result(grant)
+
+    def _wake_in(self, loop, delay: float):
+        when = loop.time() + delay
+        if self._timer is not None and self._timer.when() <= when:
+            return
+        if self._timer is not None:
+            self._timer.cancel()
+        self._timer = loop.call_at(when, self._on_timer)
+
+    def _on_timer(self):
+        self._timer = None
+        self._dispatch()
+
+    def update_from_headers(self, headers):
+        """Adopt the server's view of the limits from a response"""
+        now = asyncio.get_running_loop().time()
+        try:
+            if headers.get("x-ratelimit-limit-tokens"):
+                self.tpm = min(self.tpm, int(headers["x-ratelimit-limit-tokens"]) // self.workers)
+            if headers.get("x-ratelimit-remaining-tokens"):
+                self.remaining_tokens = int(headers["x-ratelimit-remaining-tokens"])
+                self.tokens_reset_at = now + (parse_reset(headers.get("x-ratelimit-reset-tokens")) or 60)
+            # Groq reports requests per day here; only act once it runs out
+            if headers.get("x-ratelimit-remaining-requests") == "0":
+                reset = parse_reset(headers.get("x-ratelimit-reset-requests"))
+                if reset:
+                    self.blocked_until = max(self.blocked_until, now + reset)
+        except ValueError:
+            logger.debug("Ignoring malformed rate limit headers")
+
+        retry_after = parse_reset(headers.get("retry-after"))
+        if retry_after:
+            self.blocked_until = max(self.blocked_until, now + retry_after)
+
+    def get_stats(self) -> dict:
+        return {
+            **self.stats,
+            "waited": round(self.stats["waited"], 3),
+            "queued": {caller: len(waiting) for caller, waiting in self.queues.items()},
+            "rpm": self.rpm,
+            "tpm": self.tpm,
+            "workers": self.workers,
+        }
+
+
+# Process-wide scheduler shared by every Groq call
+scheduler = GroqScheduler()
+
+
+def get_scheduler_stats():
+    """Admission, retry and queue counters for the Groq scheduler"""
+    return scheduler.get_stats()
+
+
+def backoff_delay(attempt: int) -> float:
+    """Full-jitter exponential backoff"""
+    return random.uniform(0, min(GROQ_BACKOFF_MAX, GROQ_BACKOFF_BASE * 2 ** attempt))
+
+
+def build_request(messages, stream: bool = False):
+    """Headers and JSON payload for a chat completion"""
     api_key = os.getenv("GROQ_API_KEY")
     if not api_key:
         raise RuntimeError("GROQ_API_KEY not set")
@@ -22,11 +263,118 @@ async def call_groq(messages):
         "messages": messages,
         "temperature": 0.8,
     }
+    if stream:
+        payload["stream"] = True
+
+    return headers, payload
+
+
+async def call_groq(messages, caller: str = "default"):
+    """
+    Send a chat completion through the rate-limit scheduler.
+    
+    429s, 5xx responses and transport errors are retried with jittered
+    backoff up to GROQ_MAX_RETRIES times; other errors raise immediately.
+    """
+    headers, payload = build_request(messages)
+    tokens = estimate_tokens(messages)
+
+    for attempt in range(GROQ_MAX_RETRIES + 1):
+        grant = await scheduler.acquire(caller, tokens)
+        try:
+            res = await get_client().post(GROQ_URL, json=payload, headers=headers)
+        except httpx.TransportError as e:
+            scheduler.settle(grant, None)
+            if attempt == GROQ_MAX_RETRIES:
+                scheduler.stats["failed"] += 1
+                raise
+            delay = backoff_delay(attempt)
+            logger.warning(f"Groq {type(e).__name__}; retry {attempt + 1} in {delay:.1f}s")
+        else:
+            scheduler.update_from_headers(res.headers)
+            if res.status_code not in RETRY_STATUSES:
+                if res.is_error:
+                    scheduler.settle(grant, None)
+                    scheduler.stats["failed"] += 1
+                    res.raise_for_status()
+                data = res.json()
+                scheduler.settle(grant, (data.get("usage") or {}).get("total_tokens"))
+                return data["choices"][0]["message"]["content"]
+
+            scheduler.settle(grant, None)
+            if res.status_code == 429:
+                scheduler.stats["rate_limited"] += 1
+            if attempt == GROQ_MAX_RETRIES:
+                scheduler.stats["failed"] += 1
+                res.raise_for_status()
+            # retry-after (if any) already pauses the scheduler; jitter spreads the wake-ups
+            delay = backoff_delay(attempt)
+            logger.warning(f"Groq returned {res.status_code}; retry {attempt + 1} in {delay:.1f}s")
+
+        scheduler.stats["retries"] += 1
+        await asyncio.sleep(delay)
+
+
+async def stream_groq(messages, caller: str = "default"):
+    """
+    Stream a chat completion, yielding content deltas as they arrive.
+    
+    Goes through the same scheduler as call_groq. Failures before the first
+    delta are retried the same way; once text has been yielded, an error
+    is raised to the caller instead.
+    """
+    headers, payload = build_request(messages, stream=True)
+    tokens = estimate_tokens(messages)
+
+    for attempt in range(GROQ_MAX_RETRIES + 1):
+        grant = await scheduler.acquire(caller, tokens)
+        used_tokens = None
+        yielded = False
+        try:
+            async with get_client().stream("POST", GROQ_URL, json=payload, headers=headers) as res:
+                scheduler.update_from_headers(res.headers)
+                if res.status_code not in RETRY_STATUSES:
+                    if res.is_error:
+                        await res.aread()
+                        scheduler.stats["failed"] += 1
+                        res.raise_for_status()
 
-    async with httpx.AsyncClient(timeout=60) as client:
-        res = await client.post(GROQ_URL, json=payload, headers=headers)
-        res.raise_for_status()
-        data = res.json()
+                    async for line in res.aiter_lines():
+                        if not line.startswith("data:"):
+                            continue
+                        data = line[5:].strip()
+                        if data == "[DONE]":
+                            # Read to the end so the connection goes back to the pool
+                            continue
+                        chunk = json.loads(data)
+                        # Groq reports usage on the last chunk under x_groq
+                        usage = chunk.get("usage") or (chunk.get("x_groq") or {}).get("usage")
+                        if usage:
+                            used_tokens = usage.get("total_tokens")
+                        for choice in chunk.get("choices") or []:
+                            delta = (choice.get("delta") or {}).get("content")
+                            if delta:
+                                yielded = True
+                                yield delta
+                    return
 
-    return data["choices"][0]["message"]["content"]
+                # Drain the error body so the connection can be reused for the retry
+                await res.aread()
+                if res.status_code == 429:
+                    scheduler.stats["rate_limited"] += 1
+                if attempt == GROQ_MAX_RETRIES:
+                    scheduler.stats["failed"] += 1
+                    res.raise_for_status()
+                delay = backoff_delay(attempt)
+                logger.warning(f"Groq stream returned {res.status_code}; retry {attempt + 1} in {delay:.1f}s")
+        except httpx.TransportError as e:
+            if yielded or attempt == GROQ_MAX_RETRIES:
+                scheduler.stats["failed"] += 1
+                raise
+            delay = backoff_delay(attempt)
+            logger.warning(f"Groq stream {type(e).__name__}; retry {attempt + 1} in {delay:.1f}s")
+        finally:
+            scheduler.settle(grant, used_tokens)
 
+        scheduler.stats["retries"] += 1
+        await asyncio.sleep(delay)
@@ -0,0 +1,209 @@
+"""
+Background job queue for episode generation
+"""
+import asyncio
+import logging
+import os
+import time
+import uuid
+from collections import OrderedDict
+from typing import Optional
+
+from app.moderator import run_roundtable
+from app.episodes import add_episode
+from app.audio_track import build_episode_track
+
+logger = logging.getLogger(__name__)
+
+GENERATION_WORKERS = int(os.getenv("GENERATION_WORKERS", "2"))  # Episodes generated at once
+JOB_QUEUE_MAX = int(os.getenv("JOB_QUEUE_MAX", "50"))  # Waiting jobs before submit is refused
+JOB_HISTORY_MAX = int(os.getenv("JOB_HISTORY_MAX", "200"))  # Finished jobs kept for polling
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+CANCELLED = "cancelled"
+
+
+class QueueFullError(Exception):
+    pass
+
+
+class Job:
+    def __init__(self, topic_type: str, tts_enabled: bool, on_event=None):
+        self.id = uuid.uuid4().hex
+        self.topic_type = topic_type
+        self.tts_enabled = tts_enabled
+        self.on_event = on_event
+        self.state = QUEUED
+        self.created_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self.timings = {}
+        self.turns_ready = 0
+        self.episode_id = None
+        self.episode = None
+        self.error = None
+        self.task = None
+        self.finished = asyncio.Event()
+
+    def mark(self, stage: str, since: float):
+        """Record seconds spent in a stage"""
+        self.timings[stage] = round(time.time() - since, 3)
+
+    async def wait(self):
+        await self.finished.wait()
+        return self
+
+    def to_dict(self) -> dict:
+        return {
+            "id": self.id,
+            "topic": self.topic_type,
+            "tts": self.tts_enabled,
+            "state": self.state,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "turns_ready": self.turns_ready,
+            "timings": self.timings,
+            "episode_id": self.episode_id,
+            "error": self.error,
+        }
+
+
+class JobManager:
+    def __init__(self, workers: int = GENERATION_WORKERS, max_queued: int = JOB_QUEUE_MAX,
+                 max_history: int = JOB_HISTORY_MAX):
+        self.workers = workers
+        self.max_queued = max_queued
+        self.max_history = max_history
+        self.jobs: "OrderedDict[str, Job]" = OrderedDict()
+        self.queue: Optional[asyncio.Queue] = None
+        self._worker_tasks = []
+
+    async def start(self):
+        self.queue = asyncio.Queue(maxsize=self.max_queued)
+        self._worker_tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+        logger.info(f"✅ Generation queue started with {self.workers} workers")
+
+    async def stop(self):
+        running = [j.task for j in self.jobs.values() if j.state == RUNNING and j.task]
+        for task in self._worker_tasks + running:
+            task.cancel()
+        await asyncio.gather(*self._worker_tasks, *running, return_exceptions=True)
+        self._worker_tasks = []
+
+    def submit(self, topic_type: str, tts_enabled: bool = True, on_event=None) -> Job:
+        """Queue an episode; raises QueueFullError when the backlog is full"""
+        job = Job(topic_type, tts_enabled, on_event)
+        try:
+            self.queue.put_nowait(job)
+        except asyncio.QueueFull:
+            raise QueueFullError("Generation queue is full, try again later")
+        self.jobs[job.id] = job
+        self._trim_history()
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        return self.jobs.get(job_id)
+
+    def position(self, job: Job) -> int:
+        """1-based place in line for a queued job, 0 otherwise"""
+        if job.state != QUEUED:
+            return 0
+        ahead = sum(1 for j in self.jobs.values() if j.state == QUEUED and j.created_at < job.created_at)
+        return ahead + 1
+
+    def is_idle(self) -> bool:
+        """True when nothing is queued or generating"""
+        return not any(j.state in (QUEUED, RUNNING) for j in self.jobs.values())
+
+    def cancel(self, job_id: str) -> bool:
+        """Cancel a queued or running job; False if it already finished"""
+        job = self.jobs.get(job_id)
+        if job is None or job.state not in (QUEUED, RUNNING):
+            return False
+        if job.state == RUNNING and job.task is not None:
+            job.task.cancel()
+        else:
+            # The worker skips it when it reaches the front of the queue
+            self._finish(job, CANCELLED)
+        return True
+
+    def _trim_history(self):
+        finished = [j.id for j in self.jobs.values() if j.finished.is_set()]
+        for job_id in finished[:max(0, len(self.jobs) - self.max_history)]:
+            del self.jobs[job_id]
+
+    def _finish(self, job: Job, state: str, error: str = None):
+        job.state = state
+        job.error = error
+        job.finished_at = time.time()
+        job.mark("total", job.created_at)
+        job.finished.set()
+
+    async def _worker(self):
+        while True:
+            job = await self.queue.get()
+            try:
+                if job.state == QUEUED:
+                    job.task = asyncio.create_task(self._run(job))
+                    await asyncio.wait([job.task])
+            finally:
+                self.queue.task_done()
+
+    async def _run(self, job: Job):
+        job.state = RUNNING
+        job.started_at = time.time()
+        job.mark("queue_wait", job.created_at)
+
+        async def on_event(event, data):
+            if event == "turn":
+                job.turns_ready += 1
+                # index 0 is the intro; index 1 is the first generated line
+                if data.get("index") == 1:
+                    job.mark("first_turn", job.started_at)
+            if job.on_event is not None:
+                await job.on_event(event, data)
+
+        try:
+            logger.info(f"Job {job.id}: generating topic={job.topic_type}, tts={job.tts_enabled}")
+            episode = await run_roundtable(
+                tts_enabled=job.tts_enabled, topic_type=job.topic_type, on_event=on_event
+            )
+            job.mark("generate", job.started_at)
+
+            track = None
+            if job.tts_enabled:
+                stitched_at = time.time()
+                try:
+                    track = await build_episode_track(episode["turns"])
+                except Exception as e:
+                    # Clips are still playable one by one
+                    logger.warning(f"Job {job.id}: could not build audio track: {e}")
+                job.mark("stitch", stitched_at)
+            if track:
+                episode.update(track)
+
+            stored_at = time.time()
+            # SQLite write (and index update) off the event loop
+            job.episode_id = await asyncio.to_thread(
+                add_episode, episode["topic"], episode["turns"],
+                audio_track=episode.get("audio_track"), segments=episode.get("segments"),
+            )
+            job.episode = episode
+            job.mark("store", stored_at)
+
+            logger.info(f"Job {job.id}: episode created {job.episode_id} - {episode['topic']}")
+            self._finish(job, DONE)
+        except asyncio.CancelledError:
+            logger.info(f"Job {job.id}: cancelled")
+            self._finish(job, CANCELLED)
+        except Exception as e:
+            logger.error(f"Job {job.id}: failed: {str(e)}", exc_info=True)
+            self._finish(job, FAILED, str(e))
+
+
+# Global generation queue
+job_manager = JobManager()
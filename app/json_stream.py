@@ -0,0 +1,70 @@
+# json_stream.py - Incremental parser for a JSON array arriving in chunks
+
+import json
+
+
+class JSONArrayStream:
+    """
+    Yields each top-level object of a JSON array as soon as it closes.
+
+    Feed it text chunks in order (e.g. streamed LLM output); feed() returns
+    the objects completed by that chunk. Anything before the opening '['
+    (code fences, chatter) is skipped. Objects that don't parse come back
+    as {} so positions in the array stay aligned. Only the object currently
+    being read is buffered, so memory stays flat however long the array gets.
+    """
+
+    def __init__(self):
+        self.started = False
+        self.finished = False
+        self.depth = 0
+        self.in_string = False
+        self.escaped = False
+        self.buffer = []
+
+    def feed(self, chunk: str) -> list:
+        completed = []
+        for char in chunk:
+            if self.finished:
+                break
+
+            if not self.started:
+                if char == "[":
+                    self.started = True
+                    self.depth = 1
+                continue
+
+            if self.depth > 1:
+                self.buffer.append(char)
+
+            if self.in_string:
+                if self.escaped:
+                    self.escaped = False
+                elif char == "\\":
+                    self.escaped = True
+                elif char == '"':
+                    self.in_string = False
+                continue
+
+            if char == '"':
+                self.in_string = True
+            elif char in "{[":
+                if self.depth == 1:
+                    self.buffer = [char]
+                self.depth += 1
+            elif char in "}]":
+                self.depth -= 1
+                if self.depth == 1:
+                    completed.append(self._close())
+                elif self.depth == 0:
+                    self.finished = True
+        return completed
+
+    def _close(self):
+        text = "".join(self.buffer)
+        self.buffer = []
+        try:
+            obj = json.loads(text)
+        except ValueError:
+            return {}
+        return obj if isinstance(obj, dict) else {}
@@ -1,30 +1,84 @@
 # main.py
 
 import os
+import asyncio
 import logging
-from fastapi import FastAPI, HTTPException
+import orjson
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, HTTPException, Query, Request, Response
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse, ORJSONResponse
-from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import FileResponse, ORJSONResponse, StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
+from typing import Optional
 from dotenv import load_dotenv
 from apscheduler.schedulers.background import BackgroundScheduler
 from fastapi import WebSocket, WebSocketDisconnect
-from datetime import datetime
-from app.moderator import run_roundtable
-from app.episodes import get_audio_files, add_episode, get_all_episodes
-from app.cleanup import cleanup_old_audio_files
-from app.quiz_generator import generate_quiz_questions, generate_topic_description
-from app.chat import manager
+from datetime import datetime, timedelta
+from email.utils import formatdate, parsedate_to_datetime
+from app.jobs import job_manager, Job, QueueFullError, DONE
+from app.episodes import get_audio_files, get_episode, list_episodes, episode_index
+from app.cleanup import cleanup_old_audio_files, evict_tts_cache
+from app.quiz_cache import quiz_cache, build_quiz
+from app.popular_topics import POPULAR_TOPICS
+from app.quiz_warmup import warm_popular_quizzes, QUIZ_WARMUP_MINUTES
+from app.episode_library import fill_episode_library, EPISODE_LIBRARY_MINUTES
+from app.chat import manager, DEFAULT_ROOM
+from app.groq_client import get_client, close_client, get_scheduler_stats
+from app.tts_client import get_cache_stats
+from app.audio_server import SelectiveGZipMiddleware, audio_response
+from app.worker_lock import holds_scheduler_lock
 
 load_dotenv()
 
+
+# Event loop the app runs on; scheduler threads hand async jobs to it
+app_loop = None
+
+
+def run_on_app_loop(job):
+    """Run an async job from a BackgroundScheduler thread on the app's event loop"""
+    if app_loop is None or app_loop.is_closed():
+        return
+    future = asyncio.run_coroutine_threadsafe(job(), app_loop)
+
+    def report(done):
+        if not done.cancelled() and done.exception() is not None:
+            logger.error(f"Scheduled {job.__name__} failed: {done.exception()}")
+
+    future.add_done_callback(report)
+
+
+def on_one_worker(job, *args):
+    """Run a scheduled job only in the worker holding the scheduler lock"""
+    if holds_scheduler_lock():
+        job(*args)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    global app_loop
+    app_loop = asyncio.get_running_loop()
+    # Open the shared Groq connection pool up front and close it on shutdown
+    get_client()
+    await job_manager.start()
+    await manager.start()
+    # First quiz warm-up shortly after startup; the scheduler repeats it
+    scheduler.add_job(on_one_worker, "date", args=[run_on_app_loop, warm_popular_quizzes],
+                      run_date=datetime.now() + timedelta(seconds=30))
+    yield
+    app_loop = None
+    await job_manager.stop()
+    await manager.stop()
+    await close_client()
+
+
 # Use ORJSON for faster JSON serialization
 app = FastAPI(
     title="AllCanLearn",
     description="Universal learning platform with AI podcasts and quizzes",
-    default_response_class=ORJSONResponse
+    default_response_class=ORJSONResponse,
+    lifespan=lifespan
 )
 
 # CORS middleware
@@ -36,8 +90,8 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Add Gzip compression for faster response delivery
-app.add_middleware(GZipMiddleware, minimum_size=1000)
+# Add Gzip compression for faster response delivery (not for audio or SSE)
+app.add_middleware(SelectiveGZipMiddleware, minimum_size=1000)
 
 logger = logging.getLogger(__name__)
 
@@ -47,11 +101,16 @@ os.makedirs("episodes_data", exist_ok=True)
 
 # Mount static files
 app.mount("/static", StaticFiles(directory="app/static"), name="static")
-app.mount("/tts_output", StaticFiles(directory="tts_output"), name="tts_output")
 
 # Setup background scheduler for cleanup
+# Every worker has a scheduler, but only the one holding the scheduler lock runs the jobs
 scheduler = BackgroundScheduler()
-scheduler.add_job(cleanup_old_audio_files, "cron", hour=2, minute=0)  # Daily at 2 AM
+scheduler.add_job(on_one_worker, "cron", args=[cleanup_old_audio_files], hour=2, minute=0)  # Daily at 2 AM
+scheduler.add_job(on_one_worker, "interval", args=[evict_tts_cache], minutes=30)  # Keep TTS cache under its size cap
+scheduler.add_job(on_one_worker, "interval", args=[run_on_app_loop, warm_popular_quizzes],
+                  minutes=QUIZ_WARMUP_MINUTES)  # Refill popular quiz pools as sets are served
+scheduler.add_job(on_one_worker, "interval", args=[run_on_app_loop, fill_episode_library],
+                  minutes=EPISODE_LIBRARY_MINUTES)  # Pre-render episodes off-peak when the CPU is free
 scheduler.start()
 
 logger.info("✅ Cleanup scheduler started - runs daily at 2 AM")
@@ -62,34 +121,171 @@ def health():
     return {"status": "ok"}
 
 
+def submit_job(topic: str, tts: bool, on_event=None) -> Job:
+    """Queue an episode, turning a full backlog into 503 Retry-After"""
+    try:
+        return job_manager.submit(topic, tts, on_event)
+    except QueueFullError as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "30"})
+
+
 @app.post("/generate")
 async def generate(tts: bool = True, topic: str = "government_jobs"):
     """
     Generate a roundtable episode.
     
+    Runs through the generation queue (so concurrent episodes are bounded)
+    and waits for the result. Use /api/jobs to submit without waiting.
+    
     Args:
         tts: Enable text-to-speech (default: True)
         topic: Topic type - "government_jobs" or "travel" (default: "government_jobs")
     """
-    try:
-        logger.info(f"Generating episode: topic={topic}, tts={tts}")
-        episode = await run_roundtable(tts_enabled=tts, topic_type=topic)
-        
-        # Store episode metadata
-        episode_id = add_episode(episode["topic"], episode["turns"])
-        logger.info(f"Episode created: {episode_id} - {episode['topic']}")
-        
-        return episode
-    except Exception as e:
-        logger.error(f"Error generating episode: {str(e)}", exc_info=True)
-        raise
+    logger.info(f"Generating episode: topic={topic}, tts={tts}")
+    job = await submit_job(topic, tts).wait()
+    if job.state != DONE:
+        raise HTTPException(status_code=500, detail=job.error or f"Episode generation {job.state}")
+    return job.episode
+
+
+def format_sse(event: str, data: dict) -> bytes:
+    """Encode one Server-Sent Event frame"""
+    return b"event: " + event.encode() + b"\ndata: " + orjson.dumps(data) + b"\n\n"
+
+
+@app.get("/generate/stream")
+async def generate_stream(tts: bool = True, topic: str = "government_jobs"):
+    """
+    Generate a roundtable episode and stream it as Server-Sent Events.
+    
+    Events:
+        queued: job id and place in the generation queue
+        turn: a speaker entry, sent as soon as its turn is parsed
+        tts: the audio file for a previously sent entry (same index)
+        done: the stored episode, including its id
+        error: generation failed
+    """
+    queue: asyncio.Queue = asyncio.Queue()
+
+    async def on_event(event, data):
+        await queue.put((event, data))
+
+    # The job belongs to the queue, so the episode still finishes (and is
+    # stored) if the listener disconnects midway
+    job = submit_job(topic, tts, on_event)
+
+    async def event_stream():
+        yield format_sse("queued", {"job_id": job.id, "position": job_manager.position(job)})
+        while not (job.finished.is_set() and queue.empty()):
+            get = asyncio.ensure_future(queue.get())
+            finished = asyncio.ensure_future(job.finished.wait())
+            await asyncio.wait({get, finished}, return_when=asyncio.FIRST_COMPLETED)
+            finished.cancel()
+            if get.done() or not get.cancel():
+                event, data = get.result()
+                yield format_sse(event, data)
+
+        if job.state == DONE:
+            yield format_sse("done", {"id": job.episode_id, **job.episode})
+        else:
+            yield format_sse("error", {"detail": job.error or f"Episode generation {job.state}"})
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@app.post("/api/jobs", status_code=202)
+async def create_job(tts: bool = True, topic: str = "government_jobs"):
+    """Queue an episode for background generation and return its job id"""
+    job = submit_job(topic, tts)
+    return {**job.to_dict(), "position": job_manager.position(job)}
+
+
+@app.get("/api/jobs/{job_id}")
+async def get_job(job_id: str):
+    """Poll a generation job: state, per-stage timings and episode id when done"""
+    job = job_manager.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return {**job.to_dict(), "position": job_manager.position(job)}
+
+
+@app.delete("/api/jobs/{job_id}")
+async def cancel_job(job_id: str):
+    """Cancel a queued or running generation job"""
+    job = job_manager.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    if not job_manager.cancel(job_id):
+        raise HTTPException(status_code=409, detail=f"Job already {job.state}")
+    return job.to_dict()
+
+
+def is_not_modified(request: Request, etag: str, last_modified: float) -> bool:
+    """Evaluate If-None-Match / If-Modified-Since against the current version"""
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        tags = [tag.strip() for tag in if_none_match.split(",")]
+        return "*" in tags or etag in tags or f"W/{etag}" in tags
+
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since:
+        try:
+            return int(last_modified) <= parsedate_to_datetime(if_modified_since).timestamp()
+        except (TypeError, ValueError):
+            return False
+    return False
 
 
 @app.get("/api/episodes")
-def get_episodes():
-    """Get all episodes - client-side caches for 5 minutes"""
-    episodes = get_all_episodes()
-    return {"episodes": episodes}
+def get_episodes(
+    request: Request,
+    limit: Optional[int] = Query(None, ge=1, le=100),
+    cursor: Optional[str] = None,
+    topic: Optional[str] = None,
+    fields: Optional[str] = None,
+):
+    """
+    Get episodes.
+    
+    Without parameters: the latest episode per topic, pre-serialized and
+    revalidated with ETag/Last-Modified.
+    With limit/cursor/topic/fields: a page of all episodes, newest first.
+    `fields` is a comma-separated projection (audio_files is left out
+    unless requested); follow `next_cursor` for the next page.
+    """
+    if limit is not None or cursor or topic or fields:
+        try:
+            return list_episodes(
+                limit=limit or 20,
+                cursor=cursor,
+                topic=topic,
+                fields=[f.strip() for f in fields.split(",") if f.strip()] if fields else None,
+            )
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+
+    body, etag, last_modified = episode_index.snapshot()
+    headers = {
+        "ETag": etag,
+        "Last-Modified": formatdate(last_modified, usegmt=True),
+        "Cache-Control": "no-cache",
+    }
+    if is_not_modified(request, etag, last_modified):
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+@app.get("/api/episodes/{episode_id}")
+def get_episode_detail(episode_id: str):
+    """Get a single episode, including its audio files"""
+    episode = get_episode(episode_id)
+    if episode is None:
+        raise HTTPException(status_code=404, detail="Episode not found")
+    return episode
 
 
 @app.get("/api/audio-files")
@@ -98,6 +294,24 @@ def get_audio_files_list():
     return get_audio_files()
 
 
+@app.api_route("/tts_output/{filename}", methods=["GET", "HEAD"])
+def serve_audio(filename: str, request: Request):
+    """Serve a generated clip or episode track (Range requests, immutable caching)"""
+    return audio_response(request, "tts_output", filename)
+
+
+@app.get("/api/tts/cache")
+def get_tts_cache_stats():
+    """Get TTS cache hit/miss/eviction counters"""
+    return get_cache_stats()
+
+
+@app.get("/api/groq/stats")
+def get_groq_stats():
+    """Get Groq rate-limit scheduler counters and queue depth per caller"""
+    return get_scheduler_stats()
+
+
 @app.get("/ui")
 def serve_ui():
     """Serve the web UI"""
@@ -131,27 +345,47 @@ async def generate_quiz(request: GenerateQuizRequest):
     try:
         logger.info(f"Generating quiz: {request.topic}, difficulty={request.difficulty}")
         
-        questions = await generate_quiz_questions(
+        # Questions and description run concurrently; popular quizzes come
+        # from the cache's rotating pool
+        questions, description = await build_quiz(
             topic=request.topic,
             difficulty=request.difficulty,
             num_questions=request.num_questions
         )
         
-        description = await generate_topic_description(request.topic)
-        
         return {
             "success": True,
             "topic": request.topic,
             "description": description,
+            "description_pending": description is None,
             "difficulty": request.difficulty,
             "questions": questions,
             "total_questions": len(questions)
         }
+    except asyncio.TimeoutError:
+        logger.warning(f"Quiz generation timed out: {request.topic}")
+        raise HTTPException(status_code=504, detail="Quiz generation timed out, try again shortly")
     except Exception as e:
         logger.error(f"Error generating quiz: {str(e)}", exc_info=True)
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@app.get("/api/quiz/description")
+async def get_quiz_description(topic: str):
+    """Get a topic description (memoized; use when a quiz came back with description_pending)"""
+    try:
+        return {"topic": topic, "description": await quiz_cache.get_description(topic)}
+    except Exception as e:
+        logger.error(f"Error generating description: {str(e)}", exc_info=True)
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@app.get("/api/quiz/cache")
+def get_quiz_cache_stats():
+    """Get quiz cache hit/miss/refill counters and size"""
+    return quiz_cache.get_stats()
+
+
 @app.post("/api/quiz/submit")
 async def submit_quiz(request: SubmitQuizRequest):
     """Submit quiz score"""
@@ -177,74 +411,7 @@ async def submit_quiz(request: SubmitQuizRequest):
 @app.get("/api/topics/popular")
 def get_popular_topics():
     """Get popular learning topics"""
-    return {
-        "categories": [
-            {
-                "name": "Technology",
-                "icon": "💻",
-                "topics": [
-                    "Artificial Intelligence", "Cloud Computing", "Cybersecurity",
-                    "Web Development", "Mobile Apps", "Blockchain", "Data Science"
-                ]
-            },
-            {
-                "name": "Science",
-                "icon": "🔬",
-                "topics": [
-                    "Physics", "Chemistry", "Biology", "Astronomy",
-                    "Climate Science", "Neuroscience", "Genetics"
-                ]
-            },
-            {
-                "name": "Business & Finance",
-                "icon": "💼",
-                "topics": [
-                    "Entrepreneurship", "Stock Market", "Cryptocurrency",
-                    "Marketing", "Economics", "Personal Finance", "Real Estate"
-                ]
-            },
-            {
-                "name": "Arts & Culture",
-                "icon": "🎨",
-                "topics": [
-                    "Music Theory", "Painting", "Photography", "Film Making",
-                    "Creative Writing", "Architecture", "Fashion Design"
-                ]
-            },
-            {
-                "name": "Sports & Fitness",
-                "icon": "⚽",
-                "topics": [
-                    "Football", "Basketball", "Cricket", "Tennis",
-                    "Fitness Training", "Yoga", "Nutrition"
-                ]
-            },
-            {
-                "name": "Life Skills",
-                "icon": "🌱",
-                "topics": [
-                    "Cooking", "Gardening", "Public Speaking", "Time Management",
-                    "Meditation", "Leadership", "Communication"
-                ]
-            },
-            {
-                "name": "Gaming",
-                "icon": "🎮",
-                "topics": [
-                    "Minecraft Building", "Chess Strategies", "Esports",
-                    "Game Design", "Speedrunning", "Streaming", "Game Development"
-                ]
-            },
-            {
-                "name": "Nature & Animals",
-                "icon": "🐾",
-                "topics": [
-                    "Marine Biology", "Birds", "Farming", "Beekeeping",
-                    "Wildlife Conservation", "Pet Care", "Aquariums"
-                ]
-            }
-        ]
-    }
+    return {"categories": POPULAR_TOPICS}
 
 
 @app.get("/api/leaderboard")
@@ -267,14 +434,14 @@ def get_leaderboard():
 # ============= CHAT WEBSOCKET =============
 
 @app.websocket("/ws/chat")
-async def websocket_chat(websocket: WebSocket, username: str = "Anonymous"):
-    """WebSocket endpoint for real-time chat"""
-    await manager.connect(websocket, username)
+async def websocket_chat(websocket: WebSocket, username: str = "Anonymous", room: str = DEFAULT_ROOM):
+    """WebSocket endpoint for real-time chat in one topic room"""
+    room = await manager.connect(websocket, username, room)
     
     await manager.send_personal_message({
         "type": "online_users",
-        "users": manager.get_online_users(),
-        "count": len(manager.active_connections)
+        "room": room,
+        **manager.get_online_snapshot(room)
     }, websocket)
     
     try:
@@ -286,24 +453,22 @@ async def websocket_chat(websocket: WebSocket, username: str = "Anonymous"):
                 "message": data,
                 "timestamp": datetime.now().isoformat()
             }
-            manager.add_to_history(message)
-            await manager.broadcast(message)
+            await manager.post(message, room)
             
     except WebSocketDisconnect:
-        username = manager.disconnect(websocket)
-        if username:
-            await manager.broadcast({
-                "type": "system",
-                "message": f"{username} left the chat",
-                "timestamp": datetime.now().isoformat(),
-                "online_count": len(manager.active_connections)
-            })
+        pass
+    finally:
+        # Also covers clients the manager already cut off for being too slow
+        await manager.leave(websocket)
 
 
 @app.get("/api/chat/online")
-def get_online_users():
-    """Get currently online users"""
-    return {
-        "users": manager.get_online_users(),
-        "count": len(manager.active_connections)
-    }
+async def get_online_users(room: str = DEFAULT_ROOM):
+    """Get users currently online in a room"""
+    return manager.get_online_snapshot(room)
+
+
+@app.get("/api/chat/rooms")
+async def get_chat_rooms():
+    """Rooms with people in them, busiest first"""
+    return {"rooms": manager.get_rooms()}
@@ -84,3 +84,43 @@ MENTAL_HEALTH_TOPICS = [
         ]
     }
 ]
+
+MENTAL_HEALTH_TOPIC = {
+    "key": "mental_health",
+    "topic": "Mental Health, Wellness & Personal Growth",
+    "characters": MENTAL_HEALTH_CHARACTERS,
+    "intro": (
+        "Welcome to Mental Health & Wellness Roundtable! Today we're discussing mental well-being, stress, relationships, and personal growth. "
+        "Our panel includes Dr. Arjun (Psychologist), Luna (Life Coach), James (Advocate), and Divya (Wellness Officer). "
+        "They'll share practical strategies for managing anxiety, improving sleep, healthy boundaries, and building resilience."
+    ),
+    "system_prompt": "You are 4 mental health professionals and advocates having an open, empathetic discussion about mental wellness and personal growth.",
+    "turn_template": """
+Topic: {topic}
+
+Recent conversation:
+{history}
+
+Generate the NEXT TURN with natural responses from 4 mental health and wellness experts.
+
+GUIDELINES:
+- Keep each response 1-3 sentences
+- Share evidence-based mental health insights
+- Be empathetic and non-judgmental
+- Mention specific techniques and practices
+- Address stigma around mental health openly
+- Encourage seeking help when needed
+- Be authentic about struggles
+
+Respond with JSON list of 4 objects:
+
+[
+  {{"speaker": "Dr. Arjun", "message": "Short, natural mental health insight"}},
+  {{"speaker": "Luna", "message": "Short, natural wellness perspective"}},
+  {{"speaker": "James", "message": "Short, authentic personal experience"}},
+  {{"speaker": "Divya", "message": "Short, practical organizational insight"}}
+]
+
+NO extra text. NO markdown.
+""",
+}
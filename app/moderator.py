@@ -2,27 +2,68 @@
 
 import asyncio
 import json
+import logging
+import os
 import re
-from app.groq_client import call_groq
-from app.characters import CHARACTERS
-from app.travel_characters import TRAVEL_CHARACTERS, CITIES
-from app.tech_startup_characters import TECH_STARTUP_CHARACTERS
-from app.personal_finance_characters import PERSONAL_FINANCE_CHARACTERS
-from app.mental_health_characters import MENTAL_HEALTH_CHARACTERS
+from app.groq_client import call_groq, stream_groq
+from app.json_stream import JSONArrayStream
+from app.characters import GOVERNMENT_JOBS_TOPIC
+from app.travel_characters import TRAVEL_TOPIC
+from app.tech_startup_characters import TECH_STARTUP_TOPIC
+from app.personal_finance_characters import PERSONAL_FINANCE_TOPIC
+from app.mental_health_characters import MENTAL_HEALTH_TOPIC
 from app.tts_client import speak_text
 
 MAX_TURNS = 5  # Reduced for 2.5x faster generation while maintaining quality
+DEFAULT_TOPIC = "government_jobs"
 
+# Turns requested per LLM call; >1 asks for several rounds in one completion
+TURNS_PER_CALL = int(os.getenv("ROUNDTABLE_TURNS_PER_CALL", "1"))
 
-async def generate_tts_batch(entries, tts_enabled):
+# Stream single-turn completions so each speaker's audio starts as soon as
+# their entry is complete, rather than after the whole reply
+STREAM_TURNS = os.getenv("ROUNDTABLE_STREAM", "true").lower() == "true"
+
+BATCH_INSTRUCTIONS = """
+MULTI-TURN MODE (overrides the single-turn format above):
+- Generate the next {count} turns of the conversation, not just one
+- Output ONE JSON list of {total} objects with "speaker" and "message"
+- Speakers in this order, repeated {count} times: {order}
+- Later turns must react to what was said in earlier ones
+"""
+
+logger = logging.getLogger(__name__)
+
+_tts_tasks = set()
+
+
+async def emit(on_event, event, data):
+    """Forward a progress event to the optional on_event callback."""
+    if on_event is not None:
+        await on_event(event, data)
+
+
+async def generate_tts_batch(entries, tts_enabled, on_event=None):
     """Parallelize TTS generation for multiple speakers at once."""
     if not tts_enabled:
         return entries
+
+    async def render(entry):
+        tts_result = None
+        try:
+            tts_result = await speak_text(entry["message"], entry["accent"])
+            return tts_result
+        finally:
+            # Announce each clip as soon as it is ready, not when the batch ends
+            await emit(on_event, "tts", {
+                "index": entry.get("index"),
+                "tts": f"/tts_output/{tts_result}" if tts_result else None,
+            })
     
     # Generate all TTS files in parallel
     tts_tasks = []
     for entry in entries:
-        task = speak_text(entry["message"], entry["accent"])
+        task = render(entry)
         tts_tasks.append(task)
     
     tts_results = await asyncio.gather(*tts_tasks, return_exceptions=True)
@@ -37,248 +78,259 @@ async def generate_tts_batch(entries, tts_enabled):
     return entries
 
 
-async def run_roundtable(tts_enabled=True, topic_type="government_jobs"):
-    """
-    Run a roundtable discussion.
-    
-    Args:
-        tts_enabled: Enable text-to-speech
-        topic_type: "government_jobs", "travel", "tech_startup", "personal_finance", or "mental_health"
-    """
-    if topic_type == "travel":
-        return await run_travel_roundtable(tts_enabled)
-    elif topic_type == "tech_startup":
-        return await run_tech_startup_roundtable(tts_enabled)
-    elif topic_type == "personal_finance":
-        return await run_personal_finance_roundtable(tts_enabled)
-    elif topic_type == "mental_health":
-        return await run_mental_health_roundtable(tts_enabled)
-    else:
-        return await run_government_jobs_roundtable(tts_enabled)
-
-
-async def run_government_jobs_roundtable(tts_enabled=True):
-    topic = "Government Jobs and Exams in India"
-    characters = CHARACTERS
-    turns = []
-
-    intro = (
-        "Welcome to the AI Roundtable. Today we discuss Government Jobs and Exams in India. "
-        "Our panel includes an Exam Strategist, a Serving Officer, a Fresh Qualifier, and a Citizen."
-    )
-
+async def add_intro(turns, intro, on_event=None):
+    """Append the moderator intro as the first (silent) turn."""
     turns.append({
         "speaker": "Moderator",
         "message": intro,
         "tts": None,
     })
-
-    for turn in range(MAX_TURNS):
-        prompt = build_government_jobs_prompt(turns, topic, characters)
-
-        response = await call_groq([
-            {"role": "system", "content": build_government_jobs_system_prompt(characters)},
-            {"role": "user", "content": prompt},
-        ])
-
-        parsed = normalize_responses(parse_responses(response), characters)
-        parsed = attach_accents(parsed, characters)
-
-        # Parallelize TTS for all speakers in this turn
-        parsed = await generate_tts_batch(parsed, tts_enabled)
-
-        for entry in parsed:
-            turns.append({
-                "speaker": entry["speaker"],
-                "message": entry["message"],
-                "tts": entry.get("tts"),
-            })
-
-    return {
-        "topic": topic,
-        "turns": turns,
-    }
-
-
-async def run_travel_roundtable(tts_enabled=True):
-    topic = "Our Favorite Travel Destinations"
-    characters = TRAVEL_CHARACTERS
-    turns = []
-
-    intro = (
-        f"Welcome to the AI Roundtable Travel Edition! Today we're discussing amazing destinations: "
-        f"Salt Lake City USA, Abu Dhabi UAE, Chennai and Bangalore in India, and Manchester UK. "
-        f"Our panel includes Elena from Spain who's visited all these places, Fatima from UAE who's researched them extensively, "
-        f"Priya from India whose sister lives abroad, and Carlos from Mexico who's planning to relocate."
-    )
-
-    turns.append({
+    await emit(on_event, "turn", {
+        "index": 0,
         "speaker": "Moderator",
         "message": intro,
-        "tts": None,
+        "tts_pending": False,
     })
 
-    for turn in range(MAX_TURNS):
-        prompt = build_travel_prompt(turns, topic, characters)
 
-        response = await call_groq([
-            {"role": "system", "content": build_travel_system_prompt(characters)},
-            {"role": "user", "content": prompt},
-        ])
+async def add_turn_entries(parsed, turns, tts_enabled, on_event=None):
+    """
+    Append one round of speaker entries and start rendering their audio.
+    
+    The text is added to turns right away, so the next prompt can be built
+    while this round renders. Returns the background TTS task; pass every
+    task to finish_tts before the episode is stored.
+    """
+    for entry in parsed:
+        entry["index"] = len(turns)
+        turns.append({
+            "speaker": entry["speaker"],
+            "message": entry["message"],
+            "tts": None,
+        })
+        await emit(on_event, "turn", {
+            "index": entry["index"],
+            "speaker": entry["speaker"],
+            "message": entry["message"],
+            "tts_pending": tts_enabled,
+        })
 
-        parsed = normalize_responses(parse_responses(response), characters)
-        parsed = attach_accents(parsed, characters)
+    task = asyncio.create_task(render_turn_audio(parsed, turns, tts_enabled, on_event))
+    # Keep a strong reference in case the episode fails before finish_tts
+    _tts_tasks.add(task)
+    task.add_done_callback(_tts_tasks.discard)
+    return task
 
-        # Parallelize TTS for all speakers in this turn
-        parsed = await generate_tts_batch(parsed, tts_enabled)
 
-        for entry in parsed:
-            turns.append({
-                "speaker": entry["speaker"],
-                "message": entry["message"],
-                "tts": entry.get("tts"),
-            })
+async def render_turn_audio(parsed, turns, tts_enabled, on_event=None):
+    """Render one round's clips and attach them to the matching turns."""
+    # Parallelize TTS for all speakers in this turn
+    parsed = await generate_tts_batch(parsed, tts_enabled, on_event)
 
-    return {
-        "topic": topic,
-        "turns": turns,
-    }
+    for entry in parsed:
+        turns[entry["index"]]["tts"] = entry.get("tts")
 
 
-def build_government_jobs_system_prompt(characters):
-    return """
-You are generating a lively, engaging roundtable discussion with EXACTLY 4 characters.
-
-CHARACTERS:
-- Exam Strategist: Experienced mentor, practical and strategic
-- Serving Officer: Current government officer, realistic and grounded
-- Fresh Qualifier: Recent exam qualifier, energetic and relatable
-- Citizen: Informed citizen, asks tough questions, sometimes skeptical
-
-CONVERSATION STYLE:
-- Keep responses SHORT (1-3 sentences max)
-- Use natural, conversational language
-- Show personality and emotion
-- Disagree respectfully when appropriate
-- Build on what others say
-- Ask follow-up questions
-- Use examples and stories
-
-OUTPUT RULES:
-1. Output ONLY valid JSON
-2. Output ONLY a JSON list
-3. EXACTLY 4 objects with "speaker" and "message"
-4. NO markdown, NO code blocks, NO trailing commas
-5. Each message: 1-3 sentences maximum
-"""
+async def finish_tts(pending):
+    """Wait for every background TTS task started by add_turn_entries."""
+    await asyncio.gather(*pending)
+
 
+def format_history(turns, limit=6):
+    """Render the last few turns as 'Speaker: message' lines for prompts."""
+    return "".join(f"{t['speaker']}: {t['message']}\n" for t in turns[-limit:])
 
-def build_travel_system_prompt(characters):
-    char_descriptions = "\n".join([
-        f"- {c['name']}: {c['role']} - {c['perspective']}"
-        for c in characters
-    ])
+
+class RoundtableTopic:
+    """
+    A topic definition with its prompts rendered once at startup.
     
-    return f"""
-You are generating a lively, engaging roundtable discussion about travel destinations with EXACTLY 4 characters.
-
-CHARACTERS:
-{char_descriptions}
-
-DESTINATIONS TO DISCUSS:
-- Salt Lake City, USA: Mountain activities, skiing, Temple Square, craft breweries
-- Abu Dhabi, UAE: Sheikh Zayed Grand Mosque, Louvre, desert safaris, luxury
-- Chennai, India: Marina Beach, temples, filter coffee, seafood
-- Bangalore, India: Tech hub, gardens, pub culture, pleasant weather
-- Manchester, UK: Football, music scene, industrial heritage, Northern Quarter
-
-CONVERSATION STYLE:
-- Keep responses SHORT (1-3 sentences max)
-- Share specific recommendations: places to visit, food to try, best seasons, activities
-- Use natural, conversational language with personality
-- Each character brings their unique perspective (visited, researched, sister's stories, planning to move)
-- Build on what others say
-- Ask follow-up questions
-- Share practical tips and personal insights
-
-OUTPUT RULES:
-1. Output ONLY valid JSON
-2. Output ONLY a JSON list
-3. EXACTLY 4 objects with "speaker" and "message"
-4. NO markdown, NO code blocks, NO trailing commas
-5. Each message: 1-3 sentences maximum
-"""
+    Definitions live next to their characters in the *_characters.py modules:
+    key, topic, characters, intro, system_prompt (may use {topic} and
+    {characters}) and turn_template (uses {topic} and {history}).
+    """
 
+    def __init__(self, definition):
+        self.key = definition["key"]
+        self.topic = definition["topic"]
+        self.characters = definition["characters"]
+        self.intro = definition["intro"]
 
-def build_government_jobs_prompt(turns, topic, characters):
-    history = ""
-    for t in turns[-6:]:
-        history += f"{t['speaker']}: {t['message']}\n"
+        char_descriptions = "\n".join([
+            f"- {c['name']}: {c['role']} - {c.get('perspective', c.get('style', ''))}"
+            for c in self.characters
+        ])
+        self.system_prompt = definition["system_prompt"].format(
+            topic=self.topic, characters=char_descriptions
+        )
 
-    return f"""
-Topic: {topic}
+        # Split around {history} so each turn is just two concatenations
+        prefix, suffix = definition["turn_template"].split("{history}")
+        self.prompt_prefix = prefix.format(topic=self.topic)
+        self.prompt_suffix = suffix.format(topic=self.topic)
+        self.speaker_order = ", ".join(c["name"] for c in self.characters)
 
-Recent conversation:
-{history}
+    def build_prompt(self, turns):
+        return self.prompt_prefix + format_history(turns) + self.prompt_suffix
 
-Now generate the NEXT TURN with natural, engaging responses.
+    def build_messages(self, turns):
+        return [
+            {"role": "system", "content": self.system_prompt},
+            {"role": "user", "content": self.build_prompt(turns)},
+        ]
 
-GUIDELINES:
-- Keep each response 1-3 sentences
-- Show personality and emotion
-- React to what others said
-- Ask questions or challenge ideas when natural
-- Use examples from Indian context
-- Make it sound like a real conversation
+    def build_batch_messages(self, turns, count):
+        """Messages asking for `count` rounds in a single completion."""
+        note = BATCH_INSTRUCTIONS.format(
+            count=count, total=count * len(self.characters), order=self.speaker_order
+        )
+        return [
+            {"role": "system", "content": self.system_prompt},
+            {"role": "user", "content": self.build_prompt(turns) + note},
+        ]
 
-Respond with JSON list of 4 objects:
 
-[
-  {{"speaker": "Exam Strategist", "message": "Short, natural response" }},
-  {{"speaker": "Serving Officer", "message": "Short, natural response" }},
-  {{"speaker": "Fresh Qualifier", "message": "Short, natural response" }},
-  {{"speaker": "Citizen", "message": "Short, natural response" }}
-]
+TOPIC_REGISTRY = {}
+
+
+def register_topic(definition):
+    """Compile a topic definition and make it available to run_roundtable."""
+    topic = RoundtableTopic(definition)
+    TOPIC_REGISTRY[topic.key] = topic
+    return topic
 
-NO extra text. NO markdown.
-"""
 
+for _definition in (
+    GOVERNMENT_JOBS_TOPIC,
+    TRAVEL_TOPIC,
+    TECH_STARTUP_TOPIC,
+    PERSONAL_FINANCE_TOPIC,
+    MENTAL_HEALTH_TOPIC,
+):
+    register_topic(_definition)
 
-def build_travel_prompt(turns, topic, characters):
-    history = ""
-    for t in turns[-6:]:
-        history += f"{t['speaker']}: {t['message']}\n"
 
-    speaker_names = [c['name'] for c in characters]
-    json_template = ",\n  ".join([
-        f'{{"speaker": "{name}", "message": "Short, natural travel tip/recommendation"}}'
-        for name in speaker_names
-    ])
+def get_topic(topic_type):
+    """Look up a registered topic; unknown types fall back to the default."""
+    return TOPIC_REGISTRY.get(topic_type) or TOPIC_REGISTRY[DEFAULT_TOPIC]
 
-    return f"""
-Topic: {topic}
 
-Recent conversation:
-{history}
+async def stream_round(topic, turns, tts_enabled, pending, on_event=None):
+    """
+    Request one round as a streamed completion.
+    
+    Each speaker entry is added, and its audio started, as soon as its
+    object closes in the stream. If nothing usable streams in, the full
+    reply is parsed the usual way. Each TTS task started is appended to
+    pending right away, so the caller can cancel it if this round is.
+    """
+    parser = JSONArrayStream()
+    text = []
+    used_speakers = set()
+    position = 0
 
-Now generate the NEXT TURN. Each person shares travel tips about one or more cities.
+    try:
+        async for delta in stream_groq(topic.build_messages(turns), caller="roundtable"):
+            text.append(delta)
+            for obj in parser.feed(delta):
+                entry = normalize_entry(obj, position, topic.characters, used_speakers)
+                position += 1
+                if entry is None:
+                    continue
+                parsed = attach_accents([entry], topic.characters)
+                pending.append(await add_turn_entries(parsed, turns, tts_enabled, on_event))
+    except Exception as e:
+        if not used_speakers:
+            raise
+        logger.warning(f"Stream for {topic.key} broke off after {len(used_speakers)} speakers: {e}")
+
+    if not used_speakers:
+        parsed = normalize_responses(parse_responses("".join(text)), topic.characters)
+        parsed = attach_accents(parsed, topic.characters)
+        pending.append(await add_turn_entries(parsed, turns, tts_enabled, on_event))
+        return
+
+    # Same placeholder as normalize_responses for anyone the model skipped
+    missing = [
+        {"speaker": c["name"], "message": "Let's continue."}
+        for c in topic.characters
+        if c["name"] not in used_speakers
+    ]
+    if missing:
+        parsed = attach_accents(missing, topic.characters)
+        pending.append(await add_turn_entries(parsed, turns, tts_enabled, on_event))
+
+
+async def run_roundtable(tts_enabled=True, topic_type=DEFAULT_TOPIC, on_event=None,
+                         turns_per_call=None, stream=None):
+    """
+    Run a roundtable discussion.
+    
+    Args:
+        tts_enabled: Enable text-to-speech
+        topic_type: A TOPIC_REGISTRY key: "government_jobs", "travel", "tech_startup",
+            "personal_finance", or "mental_health"
+        on_event: Optional async callback(event, data). Called with "turn" as soon as
+            a speaker entry is parsed and with "tts" when its audio file is ready.
+        turns_per_call: Rounds requested per LLM call (default TURNS_PER_CALL).
+            Values above 1 batch several rounds into one completion and fall
+            back to one call per round if the batched output can't be split.
+        stream: Stream single-round completions (default STREAM_TURNS) so each
+            speaker's audio starts as soon as their entry is complete.
+    """
+    topic = get_topic(topic_type)
+    turns = []
+    batch_size = max(1, min(turns_per_call or TURNS_PER_CALL, MAX_TURNS))
+    stream = STREAM_TURNS if stream is None else stream
 
-GUIDELINES:
-- Keep each response 1-3 sentences
-- Share specific recommendations (places, food, seasons, activities)
-- Each character brings their unique perspective
-- React to what others shared
-- Ask follow-up questions
-- Be enthusiastic and helpful
+    await add_intro(turns, topic.intro, on_event)
 
-Respond with JSON list of 4 objects:
+    # Turn N's audio renders while turn N+1 is requested from the LLM
+    pending = []
 
-[
-  {json_template}
-]
+    try:
+        remaining = MAX_TURNS
+        while remaining > 0:
+            rounds = []
+            count = min(batch_size, remaining)
+            if count > 1:
+                response = await call_groq(topic.build_batch_messages(turns, count), caller="roundtable")
+                try:
+                    rounds = split_turns(parse_responses(response), topic.characters)[:count]
+                except RuntimeError:
+                    rounds = []
+                if not rounds:
+                    logger.warning(f"Batched turns unparseable for {topic.key}; using one call per turn")
+                    batch_size = 1
+
+            if rounds:
+                for parsed in rounds:
+                    parsed = attach_accents(parsed, topic.characters)
+                    pending.append(await add_turn_entries(parsed, turns, tts_enabled, on_event))
+                remaining -= len(rounds)
+                continue
+
+            if stream:
+                await stream_round(topic, turns, tts_enabled, pending, on_event)
+            else:
+                response = await call_groq(topic.build_messages(turns), caller="roundtable")
+                parsed = normalize_responses(parse_responses(response), topic.characters)
+                parsed = attach_accents(parsed, topic.characters)
+                pending.append(await add_turn_entries(parsed, turns, tts_enabled, on_event))
+            remaining -= 1
+
+        await finish_tts(pending)
+    except BaseException:
+        # Cancelled or failed: stop this episode's clips still rendering so
+        # they don't keep espeak processes and TTS slots busy
+        for task in pending:
+            task.cancel()
+        raise
 
-NO extra text. NO markdown.
-"""
+    return {
+        "topic": topic.topic,
+        "turns": turns,
+    }
 
 
 def parse_responses(text):
@@ -345,216 +397,72 @@ def normalize_responses(data, characters):
     return final
 
 
-def attach_accents(data, characters):
-    for entry in data:
-        entry.setdefault("accent", "default")
-        for c in characters:
-            if c["name"] == entry["speaker"]:
-                entry["accent"] = c["accent"]
-    return data
-
-
-# ===== NEW TOPIC FUNCTIONS =====
-
-async def run_tech_startup_roundtable(tts_enabled=True):
-    topic = "Tech Startup Insights & Entrepreneurship"
-    characters = TECH_STARTUP_CHARACTERS
-    turns = []
-
-    intro = (
-        "Welcome to Tech Startup Roundtable! Today we're discussing key aspects of building a successful tech startup. "
-        "Our panel includes Vikram (CEO), Sofia (Product Manager), Alex (CTO), and Jasmine (Growth). "
-        "They'll share real-world insights on fundraising, scaling, hiring, and achieving product-market fit."
-    )
-
-    turns.append({
-        "speaker": "Moderator",
-        "message": intro,
-        "tts": None,
-    })
-
-    for turn in range(MAX_TURNS):
-        prompt = f"""
-Topic: {topic}
-
-Recent conversation:
-{''.join([f"{t['speaker']}: {t['message']}\n" for t in turns[-6:]])}
-
-Generate the NEXT TURN with natural responses from 4 startup experts.
-
-GUIDELINES:
-- Keep each response 1-3 sentences
-- Share practical startup wisdom
-- Mention real metrics and numbers where relevant
-- React to what others said
-- Ask follow-up questions when natural
-
-Respond with JSON list of 4 objects:
-
-[
-  {{"speaker": "Vikram", "message": "Short, natural startup insight"}},
-  {{"speaker": "Sofia", "message": "Short, natural startup insight"}},
-  {{"speaker": "Alex", "message": "Short, natural startup insight"}},
-  {{"speaker": "Jasmine", "message": "Short, natural startup insight"}}
-]
-
-NO extra text. NO markdown.
-"""
-
-        response = await call_groq([
-            {"role": "system", "content": "You are 4 experienced startup founders and operators having a lively discussion about tech startups."},
-            {"role": "user", "content": prompt},
-        ])
-
-        parsed = normalize_responses(parse_responses(response), characters)
-        parsed = attach_accents(parsed, characters)
-        parsed = await generate_tts_batch(parsed, tts_enabled)
-
-        for entry in parsed:
-            turns.append({
-                "speaker": entry["speaker"],
-                "message": entry["message"],
-                "tts": entry.get("tts"),
-            })
-
-    return {
-        "topic": topic,
-        "turns": turns,
-    }
-
-
-async def run_personal_finance_roundtable(tts_enabled=True):
-    topic = "Personal Finance & Wealth Building"
-    characters = PERSONAL_FINANCE_CHARACTERS
-    turns = []
-
-    intro = (
-        "Welcome to Personal Finance Roundtable! Today we're discussing money management, investing, and building wealth. "
-        "Our expert panel includes Raj (Financial Advisor), Isabella (Money Coach), Marcus (Entrepreneur), and Priya (Student). "
-        "They'll cover budgeting, investing, debt management, and creating financial freedom."
-    )
-
-    turns.append({
-        "speaker": "Moderator",
-        "message": intro,
-        "tts": None,
-    })
-
-    for turn in range(MAX_TURNS):
-        prompt = f"""
-Topic: {topic}
-
-Recent conversation:
-{''.join([f"{t['speaker']}: {t['message']}\n" for t in turns[-6:]])}
-
-Generate the NEXT TURN with natural responses from 4 finance experts and learners.
-
-GUIDELINES:
-- Keep each response 1-3 sentences
-- Provide practical financial advice
-- Mention specific numbers and strategies
-- Address different perspectives (traditional vs modern approaches)
-- Ask clarifying questions
-- Be encouraging to those learning
-
-Respond with JSON list of 4 objects:
-
-[
-  {{"speaker": "Raj", "message": "Short, natural finance insight"}},
-  {{"speaker": "Isabella", "message": "Short, natural finance insight"}},
-  {{"speaker": "Marcus", "message": "Short, natural finance insight"}},
-  {{"speaker": "Priya", "message": "Short, natural finance question/response"}}
-]
-
-NO extra text. NO markdown.
-"""
-
-        response = await call_groq([
-            {"role": "system", "content": "You are 4 people discussing personal finance, investing, and wealth building with different perspectives."},
-            {"role": "user", "content": prompt},
-        ])
-
-        parsed = normalize_responses(parse_responses(response), characters)
-        parsed = attach_accents(parsed, characters)
-        parsed = await generate_tts_batch(parsed, tts_enabled)
-
-        for entry in parsed:
-            turns.append({
-                "speaker": entry["speaker"],
-                "message": entry["message"],
-                "tts": entry.get("tts"),
-            })
-
-    return {
-        "topic": topic,
-        "turns": turns,
-    }
-
+def normalize_entry(entry, position, characters, used_speakers):
+    """
+    Map one streamed entry to a character the way normalize_responses does.
+    
+    Returns None for entries without a message, unknown speakers and
+    repeats; otherwise records the speaker in used_speakers.
+    """
+    speaker = entry.get("speaker") or entry.get("name") or entry.get("character")
+    message = entry.get("message") or entry.get("text") or entry.get("content")
 
-async def run_mental_health_roundtable(tts_enabled=True):
-    topic = "Mental Health, Wellness & Personal Growth"
-    characters = MENTAL_HEALTH_CHARACTERS
-    turns = []
+    if not speaker and position < len(characters):
+        speaker = characters[position]["name"]
 
-    intro = (
-        "Welcome to Mental Health & Wellness Roundtable! Today we're discussing mental well-being, stress, relationships, and personal growth. "
-        "Our panel includes Dr. Arjun (Psychologist), Luna (Life Coach), James (Advocate), and Divya (Wellness Officer). "
-        "They'll share practical strategies for managing anxiety, improving sleep, healthy boundaries, and building resilience."
-    )
+    names = [c["name"] for c in characters]
+    if not message or speaker not in names or speaker in used_speakers:
+        return None
 
-    turns.append({
-        "speaker": "Moderator",
-        "message": intro,
-        "tts": None,
-    })
+    used_speakers.add(speaker)
+    return {"speaker": speaker, "message": message}
 
-    for turn in range(MAX_TURNS):
-        prompt = f"""
-Topic: {topic}
 
-Recent conversation:
-{''.join([f"{t['speaker']}: {t['message']}\n" for t in turns[-6:]])}
+def split_turns(data, characters):
+    """
+    Split a multi-turn JSON list into complete rounds.
+    
+    A new round starts whenever a speaker repeats. Only rounds in which
+    every character speaks are kept, up to the first incomplete one, so
+    the returned rounds can be used in order.
+    """
+    if not isinstance(data, list):
+        return []
 
-Generate the NEXT TURN with natural responses from 4 mental health and wellness experts.
+    names = {c["name"] for c in characters}
+    rounds = []
+    current = {}
 
-GUIDELINES:
-- Keep each response 1-3 sentences
-- Share evidence-based mental health insights
-- Be empathetic and non-judgmental
-- Mention specific techniques and practices
-- Address stigma around mental health openly
-- Encourage seeking help when needed
-- Be authentic about struggles
+    for entry in data:
+        if not isinstance(entry, dict):
+            continue
 
-Respond with JSON list of 4 objects:
+        speaker = entry.get("speaker") or entry.get("name") or entry.get("character")
+        message = entry.get("message") or entry.get("text") or entry.get("content")
+        if speaker not in names or not message:
+            continue
 
-[
-  {{"speaker": "Dr. Arjun", "message": "Short, natural mental health insight"}},
-  {{"speaker": "Luna", "message": "Short, natural wellness perspective"}},
-  {{"speaker": "James", "message": "Short, authentic personal experience"}},
-  {{"speaker": "Divya", "message": "Short, practical organizational insight"}}
-]
+        if speaker in current:
+            rounds.append(current)
+            current = {}
+        current[speaker] = message
 
-NO extra text. NO markdown.
-"""
+    if current:
+        rounds.append(current)
 
-        response = await call_groq([
-            {"role": "system", "content": "You are 4 mental health professionals and advocates having an open, empathetic discussion about mental wellness and personal growth."},
-            {"role": "user", "content": prompt},
-        ])
+    complete = []
+    for spoken in rounds:
+        if len(spoken) != len(names):
+            break
+        complete.append([{"speaker": c["name"], "message": spoken[c["name"]]} for c in characters])
 
-        parsed = normalize_responses(parse_responses(response), characters)
-        parsed = attach_accents(parsed, characters)
-        parsed = await generate_tts_batch(parsed, tts_enabled)
+    return complete
 
-        for entry in parsed:
-            turns.append({
-                "speaker": entry["speaker"],
-                "message": entry["message"],
-                "tts": entry.get("tts"),
-            })
 
-    return {
-        "topic": topic,
-        "turns": turns,
-    }
\ No newline at end of file
+def attach_accents(data, characters):
+    for entry in data:
+        entry.setdefault("accent", "default")
+        for c in characters:
+            if c["name"] == entry["speaker"]:
+                entry["accent"] = c["accent"]
+    return data
@@ -84,3 +84,42 @@ FINANCE_TOPICS = [
         ]
     }
 ]
+
+PERSONAL_FINANCE_TOPIC = {
+    "key": "personal_finance",
+    "topic": "Personal Finance & Wealth Building",
+    "characters": PERSONAL_FINANCE_CHARACTERS,
+    "intro": (
+        "Welcome to Personal Finance Roundtable! Today we're discussing money management, investing, and building wealth. "
+        "Our expert panel includes Raj (Financial Advisor), Isabella (Money Coach), Marcus (Entrepreneur), and Priya (Student). "
+        "They'll cover budgeting, investing, debt management, and creating financial freedom."
+    ),
+    "system_prompt": "You are 4 people discussing personal finance, investing, and wealth building with different perspectives.",
+    "turn_template": """
+Topic: {topic}
+
+Recent conversation:
+{history}
+
+Generate the NEXT TURN with natural responses from 4 finance experts and learners.
+
+GUIDELINES:
+- Keep each response 1-3 sentences
+- Provide practical financial advice
+- Mention specific numbers and strategies
+- Address different perspectives (traditional vs modern approaches)
+- Ask clarifying questions
+- Be encouraging to those learning
+
+Respond with JSON list of 4 objects:
+
+[
+  {{"speaker": "Raj", "message": "Short, natural finance insight"}},
+  {{"speaker": "Isabella", "message": "Short, natural finance insight"}},
+  {{"speaker": "Marcus", "message": "Short, natural finance insight"}},
+  {{"speaker": "Priya", "message": "Short, natural finance question/response"}}
+]
+
+NO extra text. NO markdown.
+""",
+}
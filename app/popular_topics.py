@@ -0,0 +1,74 @@
+# popular_topics.py - Quiz topics featured on the home page
+
+# Served by /api/topics/popular and pre-warmed in the quiz cache
+POPULAR_TOPICS = [
+    {
+        "name": "Technology",
+        "icon": "💻",
+        "topics": [
+            "Artificial Intelligence", "Cloud Computing", "Cybersecurity",
+            "Web Development", "Mobile Apps", "Blockchain", "Data Science"
+        ]
+    },
+    {
+        "name": "Science",
+        "icon": "🔬",
+        "topics": [
+            "Physics", "Chemistry", "Biology", "Astronomy",
+            "Climate Science", "Neuroscience", "Genetics"
+        ]
+    },
+    {
+        "name": "Business & Finance",
+        "icon": "💼",
+        "topics": [
+            "Entrepreneurship", "Stock Market", "Cryptocurrency",
+            "Marketing", "Economics", "Personal Finance", "Real Estate"
+        ]
+    },
+    {
+        "name": "Arts & Culture",
+        "icon": "🎨",
+        "topics": [
+            "Music Theory", "Painting", "Photography", "Film Making",
+            "Creative Writing", "Architecture", "Fashion Design"
+        ]
+    },
+    {
+        "name": "Sports & Fitness",
+        "icon": "⚽",
+        "topics": [
+            "Football", "Basketball", "Cricket", "Tennis",
+            "Fitness Training", "Yoga", "Nutrition"
+        ]
+    },
+    {
+        "name": "Life Skills",
+        "icon": "🌱",
+        "topics": [
+            "Cooking", "Gardening", "Public Speaking", "Time Management",
+            "Meditation", "Leadership", "Communication"
+        ]
+    },
+    {
+        "name": "Gaming",
+        "icon": "🎮",
+        "topics": [
+            "Minecraft Building", "Chess Strategies", "Esports",
+            "Game Design", "Speedrunning", "Streaming", "Game Development"
+        ]
+    },
+    {
+        "name": "Nature & Animals",
+        "icon": "🐾",
+        "topics": [
+            "Marine Biology", "Birds", "Farming", "Beekeeping",
+            "Wildlife Conservation", "Pet Care", "Aquariums"
+        ]
+    }
+]
+
+
+def popular_topic_names():
+    """Every featured topic, in display order"""
+    return [topic for category in POPULAR_TOPICS for topic in category["topics"]]
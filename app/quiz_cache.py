@@ -0,0 +1,281 @@
+# quiz_cache.py - Pooled quiz question sets keyed by (topic, difficulty, num_questions)
+
+import os
+import time
+import uuid
+import asyncio
+import logging
+from collections import OrderedDict
+from typing import Optional
+
+import orjson
+
+from app.quiz_generator import generate_quiz_questions, generate_topic_description
+
+logger = logging.getLogger(__name__)
+
+QUIZ_CACHE_TTL = float(os.getenv("QUIZ_CACHE_TTL", "21600"))  # Seconds a question set stays servable
+QUIZ_CACHE_MAX_KEYS = int(os.getenv("QUIZ_CACHE_MAX_KEYS", "256"))  # LRU bound on cached quizzes
+QUIZ_POOL_SIZE = int(os.getenv("QUIZ_POOL_SIZE", "3"))  # Question sets rotated per quiz
+QUIZ_CACHE_FILE = os.getenv("QUIZ_CACHE_FILE", "")  # e.g. episodes_data/quiz_cache.json; empty = memory only
+QUIZ_DESCRIPTION_TTL = float(os.getenv("QUIZ_DESCRIPTION_TTL", "604800"))  # Topic descriptions rarely change
+QUIZ_QUESTIONS_TIMEOUT = float(os.getenv("QUIZ_QUESTIONS_TIMEOUT", "45"))  # Seconds before a quiz request gives up
+QUIZ_DESCRIPTION_TIMEOUT = float(os.getenv("QUIZ_DESCRIPTION_TIMEOUT", "10"))  # After this the quiz is sent without it
+
+
+def quiz_key(topic: str, difficulty: str, num_questions: int) -> str:
+    """Normalized cache key, so 'Cloud  computing' and 'cloud computing' share a pool"""
+    return f"{topic_key(topic)}|{difficulty.strip().lower()}|{int(num_questions)}"
+
+
+def topic_key(topic: str) -> str:
+    return " ".join(topic.split()).lower()
+
+
+def write_atomic(path: str, data: bytes):
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+    try:
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+class QuizCache:
+    """
+    TTL + LRU cache holding a small pool of question sets per quiz.
+
+    Each get() serves the next set in the pool, so repeat players rotate
+    through different questions; pools are topped up in the background up
+    to pool_size. Topic descriptions are memoized alongside. With a path,
+    the cache is loaded on first use and written back (atomically)
+    whenever something is added.
+    """
+
+    def __init__(self, ttl: float = QUIZ_CACHE_TTL, max_keys: int = QUIZ_CACHE_MAX_KEYS,
+                 pool_size: int = QUIZ_POOL_SIZE, path: str = QUIZ_CACHE_FILE):
+        self.ttl = ttl
+        self.max_keys = max_keys
+        self.pool_size = pool_size
+        self.path = path
+        self.entries: "OrderedDict[str, dict]" = OrderedDict()
+        self.descriptions: "OrderedDict[str, dict]" = OrderedDict()
+        self.stats = {"hits": 0, "misses": 0, "refills": 0, "evictions": 0, "warmed": 0}
+        self._loaded = False
+        self._inflight = {}  # key -> generation task, shared by concurrent requests
+        self._tasks = set()
+
+    def _fresh_sets(self, key: str) -> list:
+        if not self._loaded:
+            self.load()
+        entry = self.entries.get(key)
+        if entry is None:
+            return []
+        cutoff = time.time() - self.ttl
+        entry["sets"] = [s for s in entry["sets"] if s["created_at"] > cutoff]
+        if not entry["sets"]:
+            del self.entries[key]
+            return []
+        return entry["sets"]
+
+    def load(self):
+        """Read persisted sets once; expired ones are dropped on access"""
+        self._loaded = True
+        if not self.path or not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, "rb") as f:
+                data = orjson.loads(f.read())
+            for key, sets in data.get("quizzes", {}).items():
+                self.entries[key] = {"sets": sets, "next": 0}
+            self.descriptions.update(data.get("descriptions", {}))
+            logger.info(f"Loaded {len(self.entries)} cached quizzes from {self.path}")
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable quiz cache {self.path}: {e}")
+
+    def get(self, key: str) -> Optional[list]:
+        """Next question set for this quiz, or None on a miss"""
+        sets = self._fresh_sets(key)
+        if not sets:
+            return None
+        entry = self.entries[key]
+        chosen = sets[entry["next"] % len(sets)]
+        entry["next"] += 1
+        self.entries.move_to_end(key)
+        return chosen["questions"]
+
+    def pool_size_of(self, key: str) -> int:
+        return len(self._fresh_sets(key))
+
+    def add(self, key: str, questions: list):
+        if not self._loaded:
+            self.load()
+        entry = self.entries.setdefault(key, {"sets": [], "next": 0})
+        entry["sets"].append({"questions": questions, "created_at": time.time()})
+        # Oldest set leaves the pool first
+        del entry["sets"][:-self.pool_size]
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_keys:
+            self.entries.popitem(last=False)
+            self.stats["evictions"] += 1
+
+    async def save(self):
+        if not self.path:
+            return
+        data = orjson.dumps({
+            "quizzes": {key: entry["sets"] for key, entry in self.entries.items()},
+            "descriptions": self.descriptions,
+        })
+        try:
+            await asyncio.to_thread(write_atomic, self.path, data)
+        except OSError as e:
+            logger.warning(f"Could not persist quiz cache: {e}")
+
+    async def _generate(self, key: str, topic: str, difficulty: str, num_questions: int,
+                        caller: str = "quiz") -> list:
+        questions = await generate_quiz_questions(
+            topic=topic, difficulty=difficulty, num_questions=num_questions, caller=caller
+        )
+        if isinstance(questions, list) and questions:
+            self.add(key, questions)
+            await self.save()
+        return questions
+
+    def _generate_once(self, key: str, topic: str, difficulty: str, num_questions: int,
+                       caller: str = "quiz") -> asyncio.Task:
+        """One generation per key at a time; concurrent callers share it"""
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.create_task(self._generate(key, topic, difficulty, num_questions, caller))
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        return task
+
+    def refill(self, topic: str, difficulty: str, num_questions: int):
+        """Top up this quiz's pool in the background if it isn't full"""
+        key = quiz_key(topic, difficulty, num_questions)
+        if key in self._inflight or self.pool_size_of(key) >= self.pool_size:
+            return
+        self.stats["refills"] += 1
+        self._track(self._generate_once(key, topic, difficulty, num_questions))
+
+    async def add_set(self, topic: str, difficulty: str, num_questions: int, caller: str = "quiz") -> list:
+        """Generate one more question set for this quiz's pool"""
+        key = quiz_key(topic, difficulty, num_questions)
+        return await asyncio.shield(self._generate_once(key, topic, difficulty, num_questions, caller))
+
+    def _track(self, task: asyncio.Task):
+        """Keep a background task alive and log it if it fails"""
+        if task not in self._tasks:
+            self._tasks.add(task)
+            task.add_done_callback(self._log_background)
+
+    def _log_background(self, task: asyncio.Task):
+        self._tasks.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            logger.warning(f"Background quiz generation failed: {task.exception()}")
+
+    async def get_questions(self, topic: str, difficulty: str = "medium", num_questions: int = 5) -> list:
+        """
+        Serve a pooled question set, generating one on a miss.
+
+        Only a hit tops the pool up: a topic asked for once costs one Groq
+        call, and the pool grows once the topic is asked for again.
+        """
+        key = quiz_key(topic, difficulty, num_questions)
+        questions = self.get(key)
+        if questions is None:
+            self.stats["misses"] += 1
+            return await asyncio.shield(self._generate_once(key, topic, difficulty, num_questions))
+        self.stats["hits"] += 1
+        self.refill(topic, difficulty, num_questions)
+        return questions
+
+    def get_cached_description(self, topic: str) -> Optional[str]:
+        if not self._loaded:
+            self.load()
+        key = topic_key(topic)
+        memo = self.descriptions.get(key)
+        if memo is None:
+            return None
+        if memo["created_at"] <= time.time() - QUIZ_DESCRIPTION_TTL:
+            del self.descriptions[key]
+            return None
+        self.descriptions.move_to_end(key)
+        return memo["text"]
+
+    async def _describe(self, key: str, topic: str, caller: str = "quiz") -> str:
+        text = await generate_topic_description(topic, caller=caller)
+        self.descriptions[key] = {"text": text, "created_at": time.time()}
+        self.descriptions.move_to_end(key)
+        while len(self.descriptions) > self.max_keys:
+            self.descriptions.popitem(last=False)
+        await self.save()
+        return text
+
+    def describe(self, topic: str, caller: str = "quiz") -> asyncio.Task:
+        """Background task generating (and memoizing) a topic description"""
+        key = f"description|{topic_key(topic)}"
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.create_task(self._describe(topic_key(topic), topic, caller))
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        self._track(task)
+        return task
+
+    async def get_description(self, topic: str, caller: str = "quiz") -> str:
+        description = self.get_cached_description(topic)
+        if description is None:
+            description = await asyncio.shield(self.describe(topic, caller))
+        return description
+
+    def get_stats(self) -> dict:
+        return {
+            **self.stats,
+            "keys": len(self.entries),
+            "sets": sum(len(entry["sets"]) for entry in self.entries.values()),
+            "descriptions": len(self.descriptions),
+        }
+
+
+# Process-wide quiz cache
+quiz_cache = QuizCache()
+
+
+async def build_quiz(topic: str, difficulty: str = "medium", num_questions: int = 5):
+    """
+    Fetch questions and the topic description concurrently.
+    
+    Questions must arrive within QUIZ_QUESTIONS_TIMEOUT (asyncio.TimeoutError
+    otherwise). The description gets QUIZ_DESCRIPTION_TIMEOUT from the
+    start; if it isn't ready by then (or fails), None is returned and it
+    keeps generating in the background for the next request.
+    """
+    loop = asyncio.get_running_loop()
+    started = loop.time()
+
+    description = quiz_cache.get_cached_description(topic)
+    describing = quiz_cache.describe(topic) if description is None else None
+
+    # Cancelling this on timeout leaves the shared generation running,
+    # so the pool still fills for the next request
+    questions = await asyncio.wait_for(
+        quiz_cache.get_questions(topic, difficulty, num_questions), QUIZ_QUESTIONS_TIMEOUT
+    )
+
+    if describing is not None:
+        remaining = max(0.0, QUIZ_DESCRIPTION_TIMEOUT - (loop.time() - started))
+        try:
+            description = await asyncio.wait_for(asyncio.shield(describing), remaining)
+        except asyncio.TimeoutError:
+            logger.info(f"Description for '{topic}' not ready; sending quiz without it")
+        except Exception as e:
+            logger.warning(f"Description for '{topic}' failed: {e}")
+
+    return questions, description
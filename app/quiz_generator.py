@@ -5,7 +5,8 @@ import json
 import re
 
 
-async def generate_quiz_questions(topic: str, difficulty: str = "medium", num_questions: int = 5):
+async def generate_quiz_questions(topic: str, difficulty: str = "medium", num_questions: int = 5,
+                                  caller: str = "quiz"):
     """Generate quiz questions for any topic using Groq"""
     
     prompt = f"""You are a quiz game expert. Generate {num_questions} multiple choice questions about: {topic}
@@ -30,7 +31,7 @@ Return ONLY the JSON array, no other text."""
         {"role": "user", "content": prompt}
     ]
     
-    response = await call_groq(messages)
+    response = await call_groq(messages, caller=caller)
     
     # Parse JSON response
     try:
@@ -46,7 +47,7 @@ Return ONLY the JSON array, no other text."""
     return questions
 
 
-async def generate_topic_description(topic: str):
+async def generate_topic_description(topic: str, caller: str = "quiz"):
     """Generate a brief description for a topic"""
     
     prompt = f"""Write a brief 2-sentence description of the topic: {topic}
@@ -58,5 +59,5 @@ Make it engaging and educational. Just return the description text, nothing else
         {"role": "user", "content": prompt}
     ]
     
-    response = await call_groq(messages)
+    response = await call_groq(messages, caller=caller)
     return response.strip()
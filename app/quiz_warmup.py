@@ -0,0 +1,75 @@
+# quiz_warmup.py - Keep quiz pools for popular topics filled ahead of requests
+
+import os
+import asyncio
+import logging
+
+from app.popular_topics import popular_topic_names
+from app.quiz_cache import quiz_cache, quiz_key
+
+logger = logging.getLogger(__name__)
+
+QUIZ_WARMUP_BUDGET = int(os.getenv("QUIZ_WARMUP_BUDGET", "30"))  # Groq calls per warm-up run; 0 disables
+QUIZ_WARMUP_MINUTES = int(os.getenv("QUIZ_WARMUP_MINUTES", "30"))  # Minutes between warm-up runs
+QUIZ_WARMUP_CONCURRENCY = int(os.getenv("QUIZ_WARMUP_CONCURRENCY", "2"))  # Warm-up calls in flight at once
+QUIZ_WARMUP_DIFFICULTIES = ("easy", "medium", "hard")
+QUIZ_WARMUP_QUESTIONS = 5  # The quiz page's default question count
+
+_running = False
+
+
+def warmup_plan():
+    """
+    Work still missing for the popular quizzes, breadth first.
+
+    Descriptions come first, then one set for every (topic, difficulty)
+    before any pool gets a second, so a small budget covers the most
+    quizzes.
+    """
+    topics = popular_topic_names()
+    plan = [("description", topic, None) for topic in topics if quiz_cache.get_cached_description(topic) is None]
+
+    pools = {
+        (topic, difficulty): quiz_cache.pool_size_of(quiz_key(topic, difficulty, QUIZ_WARMUP_QUESTIONS))
+        for topic in topics
+        for difficulty in QUIZ_WARMUP_DIFFICULTIES
+    }
+    for level in range(1, quiz_cache.pool_size + 1):
+        plan.extend(("quiz", topic, difficulty) for (topic, difficulty), size in pools.items() if size < level)
+    return plan
+
+
+async def warm_popular_quizzes(budget: int = QUIZ_WARMUP_BUDGET) -> int:
+    """Spend up to `budget` Groq calls filling popular quiz pools; returns sets/descriptions made"""
+    global _running
+    if _running or budget <= 0:
+        return 0
+
+    _running = True
+    try:
+        plan = warmup_plan()[:budget]
+        if not plan:
+            return 0
+
+        slots = asyncio.Semaphore(QUIZ_WARMUP_CONCURRENCY)
+
+        async def run(kind, topic, difficulty):
+            async with slots:
+                # Its own caller name makes warm-up take turns with user quizzes in the Groq scheduler
+                if kind == "description":
+                    await quiz_cache.get_description(topic, caller="warmup")
+                else:
+                    await quiz_cache.add_set(topic, difficulty, QUIZ_WARMUP_QUESTIONS, caller="warmup")
+
+        results = await asyncio.gather(*(run(*item) for item in plan), return_exceptions=True)
+        failed = [r for r in results if isinstance(r, Exception)]
+        made = len(plan) - len(failed)
+        quiz_cache.stats["warmed"] += made
+
+        if failed:
+            logger.warning(f"Quiz warm-up: {made} ready, {len(failed)} failed (first error: {failed[0]})")
+        else:
+            logger.info(f"Quiz warm-up: {made} ready, {len(warmup_plan())} still to go")
+        return made
+    finally:
+        _running = False
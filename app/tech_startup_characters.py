@@ -84,3 +84,41 @@ STARTUP_TOPICS = [
         ]
     }
 ]
+
+TECH_STARTUP_TOPIC = {
+    "key": "tech_startup",
+    "topic": "Tech Startup Insights & Entrepreneurship",
+    "characters": TECH_STARTUP_CHARACTERS,
+    "intro": (
+        "Welcome to Tech Startup Roundtable! Today we're discussing key aspects of building a successful tech startup. "
+        "Our panel includes Vikram (CEO), Sofia (Product Manager), Alex (CTO), and Jasmine (Growth). "
+        "They'll share real-world insights on fundraising, scaling, hiring, and achieving product-market fit."
+    ),
+    "system_prompt": "You are 4 experienced startup founders and operators having a lively discussion about tech startups.",
+    "turn_template": """
+Topic: {topic}
+
+Recent conversation:
+{history}
+
+Generate the NEXT TURN with natural responses from 4 startup experts.
+
+GUIDELINES:
+- Keep each response 1-3 sentences
+- Share practical startup wisdom
+- Mention real metrics and numbers where relevant
+- React to what others said
+- Ask follow-up questions when natural
+
+Respond with JSON list of 4 objects:
+
+[
+  {{"speaker": "Vikram", "message": "Short, natural startup insight"}},
+  {{"speaker": "Sofia", "message": "Short, natural startup insight"}},
+  {{"speaker": "Alex", "message": "Short, natural startup insight"}},
+  {{"speaker": "Jasmine", "message": "Short, natural startup insight"}}
+]
+
+NO extra text. NO markdown.
+""",
+}
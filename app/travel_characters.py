@@ -88,3 +88,72 @@ CITIES = [
         "activities": "Football matches, music venues, museums, Northern Quarter exploration"
     },
 ]
+
+TRAVEL_TOPIC = {
+    "key": "travel",
+    "topic": "Our Favorite Travel Destinations",
+    "characters": TRAVEL_CHARACTERS,
+    "intro": (
+        "Welcome to the AI Roundtable Travel Edition! Today we're discussing amazing destinations: "
+        "Salt Lake City USA, Abu Dhabi UAE, Chennai and Bangalore in India, and Manchester UK. "
+        "Our panel includes Elena from Spain who's visited all these places, Fatima from UAE who's researched them extensively, "
+        "Priya from India whose sister lives abroad, and Carlos from Mexico who's planning to relocate."
+    ),
+    # {characters} expands to "- name: role - perspective" lines
+    "system_prompt": """
+You are generating a lively, engaging roundtable discussion about travel destinations with EXACTLY 4 characters.
+
+CHARACTERS:
+{characters}
+
+DESTINATIONS TO DISCUSS:
+- Salt Lake City, USA: Mountain activities, skiing, Temple Square, craft breweries
+- Abu Dhabi, UAE: Sheikh Zayed Grand Mosque, Louvre, desert safaris, luxury
+- Chennai, India: Marina Beach, temples, filter coffee, seafood
+- Bangalore, India: Tech hub, gardens, pub culture, pleasant weather
+- Manchester, UK: Football, music scene, industrial heritage, Northern Quarter
+
+CONVERSATION STYLE:
+- Keep responses SHORT (1-3 sentences max)
+- Share specific recommendations: places to visit, food to try, best seasons, activities
+- Use natural, conversational language with personality
+- Each character brings their unique perspective (visited, researched, sister's stories, planning to move)
+- Build on what others say
+- Ask follow-up questions
+- Share practical tips and personal insights
+
+OUTPUT RULES:
+1. Output ONLY valid JSON
+2. Output ONLY a JSON list
+3. EXACTLY 4 objects with "speaker" and "message"
+4. NO markdown, NO code blocks, NO trailing commas
+5. Each message: 1-3 sentences maximum
+""",
+    "turn_template": """
+Topic: {topic}
+
+Recent conversation:
+{history}
+
+Now generate the NEXT TURN. Each person shares travel tips about one or more cities.
+
+GUIDELINES:
+- Keep each response 1-3 sentences
+- Share specific recommendations (places, food, seasons, activities)
+- Each character brings their unique perspective
+- React to what others shared
+- Ask follow-up questions
+- Be enthusiastic and helpful
+
+Respond with JSON list of 4 objects:
+
+[
+  {{"speaker": "Elena", "message": "Short, natural travel tip/recommendation"}},
+  {{"speaker": "Fatima", "message": "Short, natural travel tip/recommendation"}},
+  {{"speaker": "Priya", "message": "Short, natural travel tip/recommendation"}},
+  {{"speaker": "Carlos", "message": "Short, natural travel tip/recommendation"}}
+]
+
+NO extra text. NO markdown.
+""",
+}
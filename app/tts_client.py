@@ -1,9 +1,31 @@
 # tts_client.py
 
+import asyncio
+import hashlib
+import json
 import subprocess
 import os
-import time
 import platform
+import uuid
+
+# Max espeak-ng/say processes rendering at once, across all episodes
+TTS_CONCURRENCY = int(os.getenv("TTS_CONCURRENCY", str(os.cpu_count() or 2)))
+
+_tts_slots = asyncio.Semaphore(TTS_CONCURRENCY)
+
+# espeak-ng with quality improvements for clarity:
+# -s: speed 100 (very slow for crystal clear speech, default is 175)
+# -p: pitch 50 (natural tone)
+# -a: amplitude 200 (very loud and clear, boost from 100 default)
+# -g: word gap 15ms (increase pause between words for clarity)
+ESPEAK_FLAGS = ["-s", "100", "-p", "50", "-a", "200", "-g", "15"]
+
+CACHE_STATS = {"hits": 0, "misses": 0, "evictions": 0}
+
+# Renders in progress, keyed by final path
+_inflight = {}
+# Callers waiting on each of those renders
+_waiters = {}
 
 # Voice mapping for espeak-ng (Linux) and say (macOS)
 VOICE_MAP_MACOS = {
@@ -38,34 +60,102 @@ def resolve_voice(accent):
     else:
         return VOICE_MAP_LINUX.get(accent, VOICE_MAP_LINUX["default"])
 
+async def run_tts_command(args):
+    """Run a TTS command in a subprocess without blocking the event loop"""
+    async with _tts_slots:
+        proc = await asyncio.create_subprocess_exec(
+            *args,
+            stdout=asyncio.subprocess.DEVNULL,
+            stderr=asyncio.subprocess.PIPE,
+        )
+        try:
+            _, stderr = await proc.communicate()
+        except asyncio.CancelledError:
+            proc.kill()
+            await proc.wait()
+            raise
+    
+    if proc.returncode != 0:
+        raise subprocess.CalledProcessError(proc.returncode, args, stderr=stderr)
+
+def get_cache_stats():
+    """Hit/miss/eviction counters for the content-addressed audio cache"""
+    return dict(CACHE_STATS)
+
+def tts_cache_key(text, voice, engine, flags):
+    """Hash everything that affects the rendered audio"""
+    payload = json.dumps([engine, voice, flags, text], ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:32]
+
 async def speak_text(text, accent, folder="tts_output"):
-    """Generate speech audio file using platform-appropriate TTS"""
-    os.makedirs(folder, exist_ok=True)
+    """
+    Generate speech audio file using platform-appropriate TTS.
     
-    timestamp = int(time.time() * 1000)
+    Files are content-addressed: the same text, voice and engine flags
+    always map to the same filename, so repeated lines are rendered once.
+    """
+    os.makedirs(folder, exist_ok=True)
     
+    voice = resolve_voice(accent)
     if is_macos():
-        # macOS: use native 'say' command with AIFF format (for local testing only)
-        filename = f"{timestamp}.aiff"
-        filepath = os.path.join(folder, filename)
-        voice = resolve_voice(accent)
-        subprocess.run(["say", "-v", voice, text, "-o", filepath], check=True)
+        engine, extension, flags = "say", "aiff", []
     else:
-        # Linux: use espeak-ng with improved quality settings
-        filename = f"{timestamp}.wav"
-        filepath = os.path.join(folder, filename)
-        voice = resolve_voice(accent)
-        
-        # espeak-ng with quality improvements for clarity:
-        # -s: speed 100 (very slow for crystal clear speech, default is 175)
-        # -p: pitch 50 (natural tone)
-        # -a: amplitude 200 (very loud and clear, boost from 100 default)
-        # -g: word gap 15ms (increase pause between words for clarity)
-        subprocess.run(
-            ["espeak-ng", "-v", voice, "-s", "100", "-p", "50", "-a", "200", "-g", "15", "-w", filepath, text],
-            check=True,
-            capture_output=True
-        )
+        engine, extension, flags = "espeak-ng", "wav", ESPEAK_FLAGS
+    
+    filename = f"{tts_cache_key(text, voice, engine, flags)}.{extension}"
+    filepath = os.path.join(folder, filename)
+    
+    try:
+        # Bump mtime so LRU eviction and the retention cleanup keep hot clips
+        os.utime(filepath)
+        CACHE_STATS["hits"] += 1
+        return filename
+    except FileNotFoundError:
+        pass
+    
+    # Identical lines requested at the same time share a single render
+    render = _inflight.get(filepath)
+    if render is None:
+        CACHE_STATS["misses"] += 1
+        render = asyncio.ensure_future(render_to_file(text, voice, flags, folder, filename))
+        _inflight[filepath] = render
+        render.add_done_callback(lambda _: _inflight.pop(filepath, None))
+    else:
+        CACHE_STATS["hits"] += 1
+    
+    _waiters[render] = _waiters.get(render, 0) + 1
+    try:
+        await asyncio.shield(render)
+    except asyncio.CancelledError:
+        # Once nobody wants the clip, stop rendering it and free the slot
+        if _waiters[render] == 1:
+            render.cancel()
+        raise
+    finally:
+        _waiters[render] -= 1
+        if not _waiters[render]:
+            del _waiters[render]
     
     # Return just filename for storage - path construction happens at higher level
     return filename
+
+async def render_to_file(text, voice, flags, folder, filename):
+    """
+    Render into a hidden temp file, then atomically rename it into place.
+    
+    Readers of tts_output never see a half-written clip, and concurrent
+    renders can't overwrite each other mid-write.
+    """
+    # Keep the extension: 'say' picks its output format from it
+    tmp_path = os.path.join(folder, f".{uuid.uuid4().hex}.{filename}")
+    try:
+        if is_macos():
+            # macOS: use native 'say' command with AIFF format (for local testing only)
+            await run_tts_command(["say", "-v", voice, text, "-o", tmp_path])
+        else:
+            # Linux: use espeak-ng with improved quality settings
+            await run_tts_command(["espeak-ng", "-v", voice, *flags, "-w", tmp_path, text])
+        os.replace(tmp_path, os.path.join(folder, filename))
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
@@ -0,0 +1,36 @@
+# worker_lock.py - Let one of several worker processes run the scheduled jobs
+
+import os
+import fcntl
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+SCHEDULER_LOCK_PATH = os.getenv("SCHEDULER_LOCK_PATH", "episodes_data/scheduler.lock")  # Held by the worker running scheduled jobs
+
+_lock_file = None
+_guard = threading.Lock()  # Scheduler jobs run on several threads
+
+
+def holds_scheduler_lock() -> bool:
+    """
+    True in the one worker that runs scheduled jobs.
+
+    The first worker to ask takes the lock and keeps it for its lifetime;
+    the OS releases it when that process exits, and the next worker to ask
+    takes over.
+    """
+    global _lock_file
+    with _guard:
+        if _lock_file is not None:
+            return True
+        lock_file = open(SCHEDULER_LOCK_PATH, "a")
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            lock_file.close()
+            return False
+        _lock_file = lock_file
+        logger.info(f"✅ Running scheduled jobs in this worker (pid {os.getpid()})")
+        return True
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Chat fan-out load test: connect many local WebSocket clients and measure
+how long each broadcast takes to reach them.
+
+Start the app, then:
+    python chat_loadtest.py --clients 2000 --messages 20 --slow 20
+
+--slow clients connect but never read, to check that they don't hold up
+everyone else. --rooms N spreads the clients over N chat rooms; messages
+go to the first room only, so only its share of clients should pay for them. Prints p50/p99/max delivery latency per message and how
+many frames an average reader received (batching keeps that low during
+join storms).
+"""
+
+import argparse
+import asyncio
+import json
+import statistics
+import time
+
+import websockets
+
+
+async def client(url, name, room, latencies, frames, ready, done_reading, slow=False):
+    async with websockets.connect(f"{url}?username={name}&room={room}", max_queue=None if not slow else 1) as ws:
+        ready.release()
+        if slow:
+            await done_reading.wait()
+            return
+        try:
+            async for raw in ws:
+                received = time.perf_counter()
+                frames.append(1)
+                data = json.loads(raw)
+                for frame in data["messages"] if data.get("type") == "batch" else [data]:
+                    text = frame.get("message", "") if frame.get("type") == "message" else ""
+                    if text.startswith("lt:"):
+                        _, seq, sent = text.split(":")
+                        latencies.setdefault(int(seq), []).append(received - float(sent))
+        except websockets.ConnectionClosed:
+            pass
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default="ws://127.0.0.1:8000/ws/chat")
+    parser.add_argument("--clients", type=int, default=1000)
+    parser.add_argument("--slow", type=int, default=0, help="clients that never read")
+    parser.add_argument("--rooms", type=int, default=1, help="rooms to spread clients over")
+    parser.add_argument("--messages", type=int, default=20)
+    parser.add_argument("--interval", type=float, default=0.1, help="seconds between messages")
+    parser.add_argument("--settle", type=float, default=5, help="seconds to let join notices drain first")
+    args = parser.parse_args()
+
+    latencies = {}
+    frames = []
+    ready = asyncio.Semaphore(0)
+    done_reading = asyncio.Event()
+
+    started = time.perf_counter()
+    tasks = [
+        asyncio.create_task(client(args.url, f"lt{i}", f"lt{i % args.rooms}", latencies, frames, ready, done_reading,
+                                   slow=i < args.slow))
+        for i in range(args.clients)
+    ]
+    for _ in range(args.clients):
+        await ready.acquire()
+    print(f"{args.clients} clients connected in {time.perf_counter() - started:.1f}s")
+    await asyncio.sleep(args.settle)  # Every join is broadcast to everyone already there
+
+    async with websockets.connect(f"{args.url}?username=sender&room=lt0") as sender:
+        for seq in range(args.messages):
+            await sender.send(f"lt:{seq}:{time.perf_counter()}")
+            await asyncio.sleep(args.interval)
+
+    # Wait for the last message to reach every reader (or give up)
+    readers = sum(1 for i in range(args.slow, args.clients) if i % args.rooms == 0)
+    deadline = time.perf_counter() + 30
+    while len(latencies.get(args.messages - 1, [])) < readers and time.perf_counter() < deadline:
+        await asyncio.sleep(0.1)
+
+    print(f"{'msg':>4} {'delivered':>10} {'p50 ms':>8} {'p99 ms':>8} {'max ms':>8}")
+    for seq in range(args.messages):
+        values = sorted(latencies.get(seq, []))
+        if not values:
+            print(f"{seq:>4} {0:>10}")
+            continue
+        p99 = values[min(len(values) - 1, int(len(values) * 0.99))]
+        print(f"{seq:>4} {len(values):>6}/{readers:<3} {statistics.median(values) * 1000:>8.1f} "
+              f"{p99 * 1000:>8.1f} {values[-1] * 1000:>8.1f}")
+
+    print(f"{len(frames) / max(1, args.clients - args.slow):.1f} frames per reader")
+
+    done_reading.set()
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Episode store benchmark: the old episodes.json store (load and rewrite the
+whole file per call) against the SQLite store in app/episodes.py, at a
+given number of stored episodes.
+
+    python episodes_benchmark.py --episodes 100000
+
+Works in a temporary directory; the real episodes.json and database are
+not touched.
+"""
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+TOPICS = ["government_jobs", "travel", "tech_startup", "personal_finance", "mental_health"]
+TURNS = [{"speaker": "Mock", "message": "Line.", "tts": "clip.wav"}] * 8
+
+
+def timed(fn, repeat):
+    """Median seconds over `repeat` calls"""
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - started)
+    return statistics.median(samples)
+
+
+def write_json_store(path, count):
+    start = datetime(2024, 1, 1)
+    episodes = {}
+    for i in range(count):
+        episode_id = str(1704067200000 + i)
+        episodes[episode_id] = {
+            "id": episode_id,
+            "topic": TOPICS[i % len(TOPICS)],
+            "created_at": (start + timedelta(seconds=i)).isoformat(),
+            "turns_count": 8,
+            "audio_files": [f"/tts_output/clip_{i}_{n}.wav" for n in range(8)],
+        }
+    with open(path, "w") as f:
+        json.dump(episodes, f, indent=2)
+    return episodes
+
+
+# The JSON store as it was: every call reads (and add rewrites) the whole file
+def json_load(path):
+    with open(path) as f:
+        return json.load(f)
+
+
+def json_add(path):
+    episodes = json_load(path)
+    episode_id = str(int(datetime.now().timestamp() * 1000))
+    episodes[episode_id] = {"id": episode_id, "topic": "travel", "created_at": datetime.now().isoformat(),
+                            "turns_count": 8, "audio_files": []}
+    with open(path, "w") as f:
+        json.dump(episodes, f, indent=2)
+
+
+def cold_get_all(episodes):
+    """get_all_episodes with the in-memory index dropped, as after a restart"""
+    episodes.episode_index._best_by_topic = None
+    return episodes.get_all_episodes()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--episodes", type=int, default=100000)
+    parser.add_argument("--repeat", type=int, default=5, help="calls per measurement (median is shown)")
+    args = parser.parse_args()
+
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    with tempfile.TemporaryDirectory() as workdir:
+        os.chdir(workdir)
+        os.environ["EPISODES_DB"] = os.path.join(workdir, "episodes.db")
+
+        print(f"Writing {args.episodes} episodes to episodes.json...")
+        sample_id = str(1704067200000 + args.episodes // 2)
+        write_json_store("episodes.json", args.episodes)
+        size_mb = os.path.getsize("episodes.json") / 1e6
+
+        json_results = {
+            "add_episode": timed(lambda: json_add("episodes.json"), args.repeat),
+            "get_episode": timed(lambda: json_load("episodes.json").get(sample_id), args.repeat),
+        }
+
+        # Imported only now so EPISODES_DB points at the temp directory
+        from app import episodes
+        started = time.perf_counter()
+        episodes.get_connection()  # Creates the schema and imports episodes.json
+        import_seconds = time.perf_counter() - started
+
+        sqlite_results = {
+            "add_episode": timed(lambda: episodes.add_episode("travel", TURNS), args.repeat),
+            "get_episode": timed(lambda: episodes.get_episode(sample_id), args.repeat),
+            "get_all_episodes": timed(lambda: cold_get_all(episodes), args.repeat),
+            "list_episodes": timed(lambda: episodes.list_episodes(limit=20, topic="travel"), args.repeat),
+        }
+
+    print(f"episodes.json: {size_mb:.1f} MB; one-time SQLite import {import_seconds:.2f}s")
+    print(f"{'operation':<18} {'json ms':>10} {'sqlite ms':>10}")
+    for name, seconds in sqlite_results.items():
+        json_ms = f"{json_results[name] * 1000:.1f}" if name in json_results else "-"
+        print(f"{name:<18} {json_ms:>10} {seconds * 1000:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Groq client benchmark: a new httpx client per call (how call_groq used to
+work) against the shared keep-alive pool from get_client().
+
+Runs mock_groq in-process, so it needs no API key or network:
+    python groq_benchmark.py --requests 200 --concurrency 10
+
+Prints p50/p99/max latency per request and how many TCP connections the
+mock server saw for each mode.
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import time
+
+# The mock must not rate-limit the benchmark; set before importing it
+os.environ.setdefault("MOCK_RPM", "1000000")
+os.environ.setdefault("MOCK_TPM", "1000000000")
+os.environ.setdefault("MOCK_LATENCY", "0.02")
+
+import httpx
+import uvicorn
+
+import mock_groq
+from app.groq_client import get_client, close_client
+
+PAYLOAD = {"model": "mock", "messages": [{"role": "user", "content": "Hello"}]}
+
+
+async def fresh_client_call(url):
+    async with httpx.AsyncClient(timeout=60) as client:
+        res = await client.post(url, json=PAYLOAD)
+        res.raise_for_status()
+
+
+async def pooled_call(url):
+    res = await get_client().post(url, json=PAYLOAD)
+    res.raise_for_status()
+
+
+async def run(name, call, url, requests, concurrency):
+    mock_groq.peers.clear()
+    latencies = []
+    gate = asyncio.Semaphore(concurrency)
+
+    async def one():
+        async with gate:
+            started = time.perf_counter()
+            await call(url)
+            latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(requests)))
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))]
+    print(f"{name:<14} {statistics.median(latencies) * 1000:>8.1f} {p99 * 1000:>8.1f} "
+          f"{latencies[-1] * 1000:>8.1f} {requests / elapsed:>8.1f} {len(mock_groq.peers):>6}")
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--port", type=int, default=9100)
+    args = parser.parse_args()
+
+    server = uvicorn.Server(uvicorn.Config(mock_groq.app, port=args.port, log_level="warning"))
+    serving = asyncio.create_task(server.serve())
+    while not server.started:
+        await asyncio.sleep(0.05)
+    url = f"http://127.0.0.1:{args.port}/openai/v1/chat/completions"
+
+    print(f"{'mode':<14} {'p50 ms':>8} {'p99 ms':>8} {'max ms':>8} {'req/s':>8} {'conns':>6}")
+    await run("client/call", fresh_client_call, url, args.requests, args.concurrency)
+    await run("shared pool", pooled_call, url, args.requests, args.concurrency)
+
+    await close_client()
+    server.should_exit = True
+    await serving
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
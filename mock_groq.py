@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for the Groq chat completions API, for load-testing the
+rate-limit scheduler without spending real quota.
+
+Run it and point the app at it:
+    MOCK_RPM=30 MOCK_TPM=6000 uvicorn mock_groq:app --port 9000
+    GROQ_URL=http://localhost:9000/openai/v1/chat/completions GROQ_API_KEY=mock \
+        uvicorn app.main:app
+
+It enforces a sliding 60s requests/tokens window like Groq does, sends the
+same x-ratelimit-* and retry-after headers, and can inject latency and
+random 5xx errors (MOCK_LATENCY, MOCK_ERROR_RATE). Streaming requests
+("stream": true) get Server-Sent Events chunks like Groq's.
+"""
+
+import asyncio
+import json
+import os
+import random
+import time
+from collections import deque
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+MOCK_RPM = int(os.getenv("MOCK_RPM", "30"))
+MOCK_TPM = int(os.getenv("MOCK_TPM", "6000"))
+MOCK_LATENCY = float(os.getenv("MOCK_LATENCY", "0.3"))  # Seconds per completion
+MOCK_ERROR_RATE = float(os.getenv("MOCK_ERROR_RATE", "0.0"))  # Fraction of 503s
+MOCK_COMPLETION_TOKENS = 300
+
+app = FastAPI(title="Mock Groq")
+window = deque()  # (time, tokens) of the last 60s
+stats = {"ok": 0, "rate_limited": 0, "errors": 0}
+peers = set()  # Client (host, port) pairs seen: one per TCP connection
+
+
+def rate_headers(now):
+    used = sum(tokens for _, tokens in window)
+    reset = (window[0][0] + 60 - now) if window else 0
+    return {
+        "x-ratelimit-limit-requests": str(MOCK_RPM),
+        "x-ratelimit-limit-tokens": str(MOCK_TPM),
+        "x-ratelimit-remaining-requests": str(max(0, MOCK_RPM - len(window))),
+        "x-ratelimit-remaining-tokens": str(max(0, MOCK_TPM - used)),
+        "x-ratelimit-reset-requests": f"{reset:.2f}s",
+        "x-ratelimit-reset-tokens": f"{reset:.2f}s",
+    }
+
+
+def fake_content(messages):
+    """
+    A roundtable-shaped JSON list naming every '- Name:' in the system
+    prompt; without names, four entries the app maps to speakers by position
+    """
+    system = messages[0].get("content", "") if messages else ""
+    names = [line[2:].split(":")[0] for line in system.splitlines() if line.startswith("- ") and ":" in line]
+    if not names:
+        return json.dumps([{"message": f"Mock line {i + 1}."} for i in range(4)])
+    return json.dumps([{"speaker": name, "message": f"Mock line from {name}."} for name in names])
+
+
+async def stream_chunks(content, usage):
+    """Groq-style SSE: a few characters per chunk, usage on the last one"""
+    for i in range(0, len(content), 8):
+        chunk = {"choices": [{"index": 0, "delta": {"content": content[i:i + 8]}}]}
+        yield f"data: {json.dumps(chunk)}\n\n"
+        await asyncio.sleep(0.01)
+    final = {"choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}], "x_groq": {"usage": usage}}
+    yield f"data: {json.dumps(final)}\n\n"
+    yield "data: [DONE]\n\n"
+
+
+@app.post("/openai/v1/chat/completions")
+async def completions(request: Request):
+    peers.add((request.client.host, request.client.port))
+    body = await request.json()
+    messages = body.get("messages", [])
+    prompt_tokens = sum(len(m.get("content", "")) for m in messages) // 4
+    tokens = prompt_tokens + MOCK_COMPLETION_TOKENS
+
+    now = time.time()
+    while window and now - window[0][0] >= 60:
+        window.popleft()
+
+    used = sum(t for _, t in window)
+    if len(window) >= MOCK_RPM or used + tokens > MOCK_TPM:
+        stats["rate_limited"] += 1
+        retry_after = max(1, round(window[0][0] + 60 - now)) if window else 1
+        headers = {**rate_headers(now), "retry-after": str(retry_after)}
+        return JSONResponse({"error": {"message": "Rate limit reached"}}, status_code=429, headers=headers)
+
+    window.append((now, tokens))
+    await asyncio.sleep(MOCK_LATENCY)
+
+    if random.random() < MOCK_ERROR_RATE:
+        stats["errors"] += 1
+        return JSONResponse({"error": {"message": "Service unavailable"}}, status_code=503)
+
+    stats["ok"] += 1
+    usage = {
+        "prompt_tokens": prompt_tokens,
+        "completion_tokens": MOCK_COMPLETION_TOKENS,
+        "total_tokens": tokens,
+    }
+    if body.get("stream"):
+        return StreamingResponse(
+            stream_chunks(fake_content(messages), usage),
+            media_type="text/event-stream",
+            headers=rate_headers(now),
+        )
+
+    return JSONResponse({
+        "choices": [{"message": {"role": "assistant", "content": fake_content(messages)}}],
+        "usage": usage,
+    }, headers=rate_headers(now))
+
+
+@app.get("/stats")
+def get_stats():
+    return {**stats, "connections": len(peers)}
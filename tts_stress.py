@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+TTS stress test: render hundreds of clips at once through speak_text and
+check that the TTS_CONCURRENCY cap holds, that duplicate lines share one
+render, and that no partial or temp files are left behind.
+
+    python tts_stress.py --clips 300 --unique 100
+
+Needs espeak-ng (or 'say' on macOS). --simulate swaps the engine for a
+small Python process that writes a WAV, to exercise the scheduling
+without a speech engine installed.
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import sys
+import tempfile
+import time
+import wave
+
+from app import tts_client
+from app.tts_client import speak_text, get_cache_stats, TTS_CONCURRENCY
+
+ACCENTS = ["American", "British", "Indian English", "Australian"]
+
+# Writes a second of silence to argv[1] after a short, CPU-ish pause
+SIMULATED_ENGINE = """
+import sys, time, wave
+time.sleep(0.05)
+with wave.open(sys.argv[1], "wb") as out:
+    out.setnchannels(1); out.setsampwidth(2); out.setframerate(22050)
+    out.writeframes(b"\\0\\0" * 22050)
+"""
+
+
+def simulate_engine():
+    original = tts_client.run_tts_command
+
+    async def run_simulated(args):
+        output = args[args.index("-w" if "-w" in args else "-o") + 1]
+        await original([sys.executable, "-c", SIMULATED_ENGINE, output])
+
+    tts_client.run_tts_command = run_simulated
+
+
+async def sample_peak(stop: asyncio.Event, peak: list):
+    """Highest number of TTS slots in use at once"""
+    while not stop.is_set():
+        peak[0] = max(peak[0], TTS_CONCURRENCY - tts_client._tts_slots._value)
+        await asyncio.sleep(0.002)
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--clips", type=int, default=300, help="speak_text calls made at once")
+    parser.add_argument("--unique", type=int, default=100, help="distinct lines among them")
+    parser.add_argument("--simulate", action="store_true", help="fake the speech engine")
+    args = parser.parse_args()
+
+    if args.simulate:
+        simulate_engine()
+
+    lines = [(f"Stress line number {i}.", ACCENTS[i % len(ACCENTS)]) for i in range(args.unique)]
+    requests = [lines[i % args.unique] for i in range(args.clips)]
+    random.shuffle(requests)
+
+    with tempfile.TemporaryDirectory() as folder:
+        stop, peak = asyncio.Event(), [0]
+        sampler = asyncio.create_task(sample_peak(stop, peak))
+
+        started = time.perf_counter()
+        results = await asyncio.gather(*(speak_text(text, accent, folder) for text, accent in requests),
+                                       return_exceptions=True)
+        elapsed = time.perf_counter() - started
+        stop.set()
+        await sampler
+
+        errors = [r for r in results if isinstance(r, Exception)]
+        files = os.listdir(folder)
+        leftovers = [f for f in files if f.startswith(".")]
+        broken = 0
+        for name in files:
+            if name.endswith(".wav") and not name.startswith("."):
+                try:
+                    with wave.open(os.path.join(folder, name)) as clip:
+                        broken += clip.getnframes() == 0
+                except (wave.Error, EOFError):
+                    broken += 1
+
+    stats = get_cache_stats()
+    print(f"{args.clips} clips ({args.unique} distinct) in {elapsed:.2f}s")
+    print(f"renders: {stats['misses']}  shared/cached: {stats['hits']}  errors: {len(errors)}")
+    print(f"peak concurrent renders: {peak[0]} (TTS_CONCURRENCY={TTS_CONCURRENCY})")
+    print(f"clips on disk: {len(files) - len(leftovers)}  unreadable: {broken}  temp files left: {len(leftovers)}")
+    if errors:
+        print(f"first error: {errors[0]!r}")
+
+    ok = (not errors and not leftovers and not broken and peak[0] <= TTS_CONCURRENCY
+          and stats["misses"] == args.unique)
+    print("OK" if ok else "FAILED")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())